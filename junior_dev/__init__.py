@@ -1,5 +1,6 @@
 from junior_dev.scoring import BTMMScoringEngine, BTStats, ComparisonResult
-from junior_dev.judge import PairwiseJudge, JudgmentResult
+from junior_dev.judge import PairwiseJudge, JudgmentResult, JudgmentLog
+from junior_dev.judge_cache import JudgeCache
 from junior_dev.git_manager import GitManager
 from junior_dev.coding_agent import CodingAgent, AgentResult
 
@@ -10,6 +11,8 @@ __all__ = [
     "ComparisonResult",
     "PairwiseJudge",
     "JudgmentResult",
+    "JudgmentLog",
+    "JudgeCache",
     "GitManager",
     "CodingAgent",
     "AgentResult",
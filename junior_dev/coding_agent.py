@@ -1,44 +1,106 @@
+import asyncio
+import hashlib
+import json
+import selectors
 import subprocess
 import os
 import sys
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict
 from dataclasses import dataclass
 
 DEFAULT_AGENT_TIMEOUT_SECONDS = 7200
-POLL_INTERVAL_SECONDS = 0.1
 GIT_STATUS_TIMEOUT_SECONDS = 5
 THREAD_JOIN_TIMEOUT_SECONDS = 2
 
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
 
-@dataclass
+
+MAX_INTERN_OUTPUT_CHARS = 65536
+MAX_STREAM_BUFFER_BYTES = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
 class AgentResult:
+    __slots__ = ("success", "output", "error", "execution_time", "exit_code",
+                 "changes_made", "output_hash", "output_truncated")
+
     success: bool
     output: str
     error: str
     execution_time: float
     exit_code: int
     changes_made: bool
+    # SHA-256 of the full stdout stream (even the part dropped when a
+    # runaway agent overflows the tail buffer) and whether that happened.
+    output_hash: str
+    output_truncated: bool
+
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 
 def _project_root() -> Path:
-    return Path(__file__).resolve().parent.parent
+    return _PROJECT_ROOT
 
 
-def _pipeline_env(agents_dir: Path, backend: str) -> Dict[str, str]:
+def _base_pipeline_env() -> Dict[str, str]:
     env = dict(os.environ)
-    env["AGENT_BACKEND"] = backend
-    env["AGENTS_DIR"] = str(agents_dir)
     env["PATH"] = os.path.expanduser("~/.local/bin") + os.pathsep + env.get("PATH", "")
     return env
 
 
-def _read_stream(pipe, lines: List[str], file=sys.stdout):
-    for line in iter(pipe.readline, ""):
-        print(line, end="", flush=True, file=file)
-        lines.append(line)
+STREAM_CHUNK_BYTES = 65536
+
+
+class _StreamBuffer:
+    """Tail-bounded stream accumulator.
+
+    Keeps at most MAX_STREAM_BUFFER_BYTES of the newest chunks so a
+    runaway agent cannot exhaust memory before the timeout fires, while a
+    running SHA-256 still covers every byte seen.
+    """
+
+    __slots__ = ("_chunks", "_size", "_hash", "truncated")
+
+    def __init__(self):
+        self._chunks = deque()
+        self._size = 0
+        self._hash = hashlib.sha256()
+        self.truncated = False
+
+    def append(self, chunk: bytes):
+        self._hash.update(chunk)
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        while self._size > MAX_STREAM_BUFFER_BYTES and len(self._chunks) > 1:
+            self._size -= len(self._chunks.popleft())
+            self.truncated = True
+
+    def decode(self) -> str:
+        return b"".join(self._chunks).decode("utf-8", errors="replace")
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _read_stream(pipe, buf: "_StreamBuffer", file=sys.stdout):
+    # Binary chunk reads into a bounded buffer: one decode at the end
+    # instead of a string per line plus a large join for chatty agents.
+    tee = getattr(file, "buffer", file)
+    for chunk in iter(lambda: pipe.read1(STREAM_CHUNK_BYTES), b""):
+        tee.write(chunk)
+        tee.flush()
+        buf.append(chunk)
     pipe.close()
 
 
@@ -51,6 +113,7 @@ class CodingAgent:
         agent_args: Optional[List[str]] = None,
         agents_dir: Optional[str] = None,
         pipeline_backend: Optional[str] = None,
+        use_daemon: bool = False,
     ):
         if agent_type != "pipeline":
             raise ValueError(f"Only 'pipeline' agent type is supported. Got: {agent_type}")
@@ -61,14 +124,25 @@ class CodingAgent:
         self.agent_args = agent_args or []
         self.agents_dir = Path(agents_dir) if agents_dir else None
         self.pipeline_backend = pipeline_backend
+        self._pygit2_repo = None
+        self.use_daemon = use_daemon
+        self._pipeline_proc: Optional[subprocess.Popen] = None
+        # Snapshot the environment once; per-launch we only overlay the
+        # two pipeline variables instead of copying os.environ each time.
+        self._base_env = _base_pipeline_env()
 
     def execute(self, prompt: str) -> AgentResult:
         start = time.time()
         try:
-            success, output, error, exit_code, changes = self._run_pipeline(prompt)
+            success, output, error, exit_code, changes, output_hash, truncated = self._run_pipeline(prompt)
         except Exception as e:
-            success, output, error, exit_code, changes = False, "", str(e), -1, False
+            success, output, error, exit_code, changes, output_hash, truncated = \
+                False, "", str(e), -1, False, "", False
 
+        if len(output) < MAX_INTERN_OUTPUT_CHARS:
+            # Identical outputs across candidates (e.g. "no changes made")
+            # share one string instead of N copies.
+            output = sys.intern(output)
         return AgentResult(
             success=success,
             output=output,
@@ -76,18 +150,66 @@ class CodingAgent:
             execution_time=time.time() - start,
             exit_code=exit_code,
             changes_made=changes,
+            output_hash=output_hash,
+            output_truncated=truncated,
         )
 
+    async def execute_async(self, prompt: str) -> AgentResult:
+        """Async variant of execute; drains both pipes on the event loop
+        instead of spawning two reader threads per subprocess."""
+        start = time.time()
+        try:
+            success, output, error, exit_code, changes, output_hash, truncated = \
+                await self._run_pipeline_async(prompt)
+        except Exception as e:
+            success, output, error, exit_code, changes, output_hash, truncated = \
+                False, "", str(e), -1, False, "", False
+
+        if len(output) < MAX_INTERN_OUTPUT_CHARS:
+            output = sys.intern(output)
+        return AgentResult(
+            success=success,
+            output=output,
+            error=error,
+            execution_time=time.time() - start,
+            exit_code=exit_code,
+            changes_made=changes,
+            output_hash=output_hash,
+            output_truncated=truncated,
+        )
+
+    def execute_many(self, prompts: List[str], max_concurrency: int = 8) -> List[AgentResult]:
+        """Run several prompts concurrently and return results in input order.
+
+        Agent runs are subprocess-bound, so threads overlap the waiting.
+        All runs share this agent's working_dir; callers whose prompts
+        would write conflicting files should use separate agents.
+        """
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(self.execute, prompts))
+
     def check_agent_available(self) -> bool:
-        return self._pipeline_script() is not None
+        return self._pipeline_script is not None
 
+    def _pipeline_env(self) -> Dict[str, str]:
+        env = dict(self._base_env)
+        env["AGENT_BACKEND"] = self._backend()
+        env["AGENTS_DIR"] = str(self._agents_dir)
+        return env
+
+    @cached_property
     def _agents_dir(self) -> Path:
         if self.agents_dir is None:
             return _project_root() / ".agents"
         return self.agents_dir if self.agents_dir.is_absolute() else _project_root() / self.agents_dir
 
+    @cached_property
     def _pipeline_script(self) -> Optional[Path]:
-        script = self._agents_dir() / "run_pipeline.sh"
+        # Cached: the answer is invariant per agent, and this is otherwise
+        # two stat syscalls on every availability check and pipeline run.
+        script = self._agents_dir / "run_pipeline.sh"
         if script.is_file() and os.access(script, os.X_OK):
             return script
         return None
@@ -102,54 +224,247 @@ class CodingAgent:
                 return arg.split("=", 1)[1]
         return os.getenv("AGENT_BACKEND", "cursor")
 
-    def _run_pipeline(self, prompt: str) -> Tuple[bool, str, str, int, bool]:
+    def _run_pipeline(self, prompt: str) -> Tuple[bool, str, str, int, bool, str, bool]:
         if not self.working_dir:
-            return False, "", "pipeline agent requires working_dir", -1, False
+            return False, "", "pipeline agent requires working_dir", -1, False, "", False
 
-        script = self._pipeline_script()
+        script = self._pipeline_script
         if not script:
-            return False, "", f"Pipeline script not found or not executable: {self._agents_dir() / 'run_pipeline.sh'}", -1, False
+            return False, "", f"Pipeline script not found or not executable: {self._agents_dir / 'run_pipeline.sh'}", -1, False, "", False
 
-        env = _pipeline_env(self._agents_dir(), self._backend())
+        env = self._pipeline_env()
         cmd = ["bash", str(script), prompt]
 
         try:
-            exit_code, output, err = self._run_cmd(cmd, str(self.working_dir), env)
+            pre_head = self._git_head()
+            daemon_result = self._run_daemon(script, prompt) if self.use_daemon else None
+            if daemon_result is not None:
+                exit_code, output, err = daemon_result
+                output_hash = hashlib.sha256(output.encode()).hexdigest()
+                truncated = False
+            else:
+                exit_code, output, err, output_hash, truncated = self._run_cmd(cmd, str(self.working_dir), env)
             success = exit_code == 0
-            changes = self._git_has_changes() if success else False
-            return success, output, err, exit_code, changes
+            changes = self._detect_changes(pre_head) if success else False
+            return success, output, err, exit_code, changes, output_hash, truncated
         except Exception as e:
-            return False, "", str(e), -1, False
+            return False, "", str(e), -1, False, "", False
+
+    def _run_daemon(self, script: Path, prompt: str) -> Optional[Tuple[int, str, str]]:
+        """Send the prompt to a resident run_pipeline.sh --server process.
+
+        Amortizes agent startup cost across calls. Returns None (and turns
+        the daemon off) when the script does not support server mode, so
+        callers fall back to the per-call spawn. Note: self.timeout is not
+        enforced on daemon responses.
+        """
+        proc = self._pipeline_proc
+        if proc is None or proc.poll() is not None:
+            try:
+                proc = subprocess.Popen(
+                    ["bash", str(script), "--server"],
+                    cwd=str(self.working_dir), env=self._pipeline_env(),
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                    text=True, bufsize=1,
+                )
+            except OSError:
+                self.use_daemon = False
+                return None
+            self._pipeline_proc = proc
+
+        request = json.dumps({"prompt": prompt, "workdir": str(self.working_dir)})
+        try:
+            proc.stdin.write(request + "\n")
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+            response = json.loads(line)
+            return (int(response.get("exit_code", -1)),
+                    str(response.get("output", "")),
+                    str(response.get("error", "")))
+        except (OSError, ValueError, TypeError):
+            self.use_daemon = False
+            self._close_daemon()
+            return None
 
-    def _run_cmd(self, cmd: List[str], cwd: str, env: Dict[str, str]) -> Tuple[int, str, str]:
+    def _close_daemon(self):
+        if self._pipeline_proc is not None:
+            if self._pipeline_proc.poll() is None:
+                self._pipeline_proc.kill()
+                self._pipeline_proc.wait()
+            self._pipeline_proc = None
+
+    def close(self):
+        self._close_daemon()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def _run_pipeline_async(self, prompt: str) -> Tuple[bool, str, str, int, bool, str, bool]:
+        if not self.working_dir:
+            return False, "", "pipeline agent requires working_dir", -1, False, "", False
+
+        script = self._pipeline_script
+        if not script:
+            return False, "", f"Pipeline script not found or not executable: {self._agents_dir / 'run_pipeline.sh'}", -1, False, "", False
+
+        env = self._pipeline_env()
+        cmd = ["bash", str(script), prompt]
+
+        try:
+            pre_head = self._git_head()
+            exit_code, output, err, output_hash, truncated = await self._run_cmd_async(cmd, str(self.working_dir), env)
+            success = exit_code == 0
+            changes = self._detect_changes(pre_head) if success else False
+            return success, output, err, exit_code, changes, output_hash, truncated
+        except Exception as e:
+            return False, "", str(e), -1, False, "", False
+
+    async def _run_cmd_async(self, cmd: List[str], cwd: str, env: Dict[str, str]) -> Tuple[int, str, str, str, bool]:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, cwd=cwd, env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return -1, "", f"Pipeline execution timed out after {self.timeout}s", "", False
+
+        return (process.returncode or 0, stdout.decode(), stderr.decode(),
+                hashlib.sha256(stdout).hexdigest(), False)
+
+    def _run_cmd(self, cmd: List[str], cwd: str, env: Dict[str, str]) -> Tuple[int, str, str, str, bool]:
+        if os.name == "posix":
+            return self._run_cmd_selectors(cmd, cwd, env)
+        return self._run_cmd_threads(cmd, cwd, env)
+
+    def _run_cmd_selectors(self, cmd: List[str], cwd: str, env: Dict[str, str]) -> Tuple[int, str, str, str, bool]:
+        # epoll/kqueue on both pipes in one thread: no reader threads, no
+        # poll interval, immediate tee and exit detection.
+        process = subprocess.Popen(
+            cmd, cwd=cwd, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        out_buf = _StreamBuffer()
+        err_buf = _StreamBuffer()
+        deadline = time.monotonic() + self.timeout
+        timeout_error = f"Pipeline execution timed out after {self.timeout}s"
+
+        sel = selectors.DefaultSelector()
+        sel.register(process.stdout, selectors.EVENT_READ, (out_buf, sys.stdout))
+        sel.register(process.stderr, selectors.EVENT_READ, (err_buf, sys.stderr))
+        try:
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    process.kill()
+                    process.wait()
+                    return -1, out_buf.decode(), timeout_error, out_buf.hexdigest(), out_buf.truncated
+                for key, _ in sel.select(timeout=min(1.0, remaining)):
+                    chunk = key.fileobj.read1(STREAM_CHUNK_BYTES)
+                    if chunk:
+                        buf, file = key.data
+                        tee = getattr(file, "buffer", file)
+                        tee.write(chunk)
+                        tee.flush()
+                        buf.append(chunk)
+                    else:
+                        sel.unregister(key.fileobj)
+        finally:
+            sel.close()
+            process.stdout.close()
+            process.stderr.close()
+
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            return -1, out_buf.decode(), timeout_error, out_buf.hexdigest(), out_buf.truncated
+
+        return (process.returncode or 0, out_buf.decode(), err_buf.decode(),
+                out_buf.hexdigest(), out_buf.truncated)
+
+    def _run_cmd_threads(self, cmd: List[str], cwd: str, env: Dict[str, str]) -> Tuple[int, str, str, str, bool]:
         process = subprocess.Popen(
             cmd, cwd=cwd, env=env,
             stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            text=True, bufsize=1,
         )
-        out_lines: List[str] = []
-        err_lines: List[str] = []
-        t_out = threading.Thread(target=_read_stream, args=(process.stdout, out_lines), daemon=True)
-        t_err = threading.Thread(target=_read_stream, args=(process.stderr, err_lines), kwargs={"file": sys.stderr}, daemon=True)
+        out_buf = _StreamBuffer()
+        err_buf = _StreamBuffer()
+        t_out = threading.Thread(target=_read_stream, args=(process.stdout, out_buf), daemon=True)
+        t_err = threading.Thread(target=_read_stream, args=(process.stderr, err_buf), kwargs={"file": sys.stderr}, daemon=True)
         t_out.start()
         t_err.start()
 
-        start = time.time()
-        while process.poll() is None:
-            if time.time() - start > self.timeout:
-                process.kill()
-                t_out.join(timeout=1)
-                t_err.join(timeout=1)
-                return -1, "".join(out_lines), f"Pipeline execution timed out after {self.timeout}s"
-            time.sleep(POLL_INTERVAL_SECONDS)
+        # Blocking waitpid with an OS-level timeout: returns the instant the
+        # child exits instead of on the next poll tick.
+        try:
+            process.wait(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            t_out.join(timeout=1)
+            t_err.join(timeout=1)
+            return (-1, out_buf.decode(), f"Pipeline execution timed out after {self.timeout}s",
+                    out_buf.hexdigest(), out_buf.truncated)
 
         t_out.join(timeout=THREAD_JOIN_TIMEOUT_SECONDS)
         t_err.join(timeout=THREAD_JOIN_TIMEOUT_SECONDS)
-        return process.returncode or 0, "".join(out_lines), "".join(err_lines)
+        return (process.returncode or 0, out_buf.decode(), err_buf.decode(),
+                out_buf.hexdigest(), out_buf.truncated)
+
+    def _detect_changes(self, pre_head: Optional[str]) -> bool:
+        """True if the agent left uncommitted changes or moved HEAD.
+
+        The HEAD comparison catches agents that commit their own work,
+        which a working-tree status check alone would miss.
+        """
+        if self._git_has_changes():
+            return True
+        post_head = self._git_head()
+        return post_head is not None and post_head != pre_head
+
+    def _git_head(self) -> Optional[str]:
+        if not self.working_dir:
+            return None
+
+        if PYGIT2_AVAILABLE:
+            try:
+                if self._pygit2_repo is None:
+                    self._pygit2_repo = pygit2.Repository(str(self.working_dir))
+                return str(self._pygit2_repo.head.target)
+            except Exception:
+                pass
+
+        try:
+            r = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=str(self.working_dir), capture_output=True, text=True,
+                timeout=GIT_STATUS_TIMEOUT_SECONDS,
+            )
+            return r.stdout.strip() if r.returncode == 0 else None
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return None
 
     def _git_has_changes(self) -> bool:
         if not self.working_dir:
             return False
+
+        if PYGIT2_AVAILABLE:
+            # libgit2 reads the index/tree in-process, skipping the
+            # fork+exec of a git subprocess after every agent run.
+            try:
+                if self._pygit2_repo is None:
+                    self._pygit2_repo = pygit2.Repository(str(self.working_dir))
+                return bool(self._pygit2_repo.status())
+            except Exception:
+                pass  # not a repo or libgit2 error; fall through to git CLI
+
         try:
             r = subprocess.run(
                 ["git", "status", "--porcelain"],
@@ -1,22 +1,43 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Iterable, Optional, Dict, Any, Tuple
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader  # libyaml: ~5-10x faster parse
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# Parsed configs keyed by (resolved path, mtime); evaluation loops reload
+# the same file many times, so hits skip both the read and the YAML parse.
+_CONFIG_CACHE: Dict[Tuple[str, float], Dict[str, Any]] = {}
+
 
 def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     if config_path is None:
         return {}
-    
+
     config_path = Path(config_path)
     if not config_path.exists():
         return {}
-    
+
+    key = (str(config_path.resolve()), config_path.stat().st_mtime)
+    if key in _CONFIG_CACHE:
+        return _CONFIG_CACHE[key]
+
     with open(config_path) as f:
-        return yaml.safe_load(f) or {}
+        config = yaml.load(f, Loader=_SafeLoader) or {}
+    _CONFIG_CACHE[key] = config
+    return config
+
+
+@lru_cache(maxsize=256)
+def _split_key_path(key_path: str) -> Tuple[str, ...]:
+    return tuple(key_path.split("."))
 
 
 def get_config_value(config: Dict[str, Any], key_path: str, default: Any = None) -> Any:
-    keys = key_path.split(".")
+    keys = _split_key_path(key_path)
     value = config
     for key in keys:
         if isinstance(value, dict) and key in value:
@@ -25,3 +46,8 @@ def get_config_value(config: Dict[str, Any], key_path: str, default: Any = None)
             return default
     return value if value is not None else default
 
+
+def get_config_values(config: Dict[str, Any], key_paths: Iterable[str],
+                      default: Any = None) -> Dict[str, Any]:
+    """Look up several dotted key paths at once; returns {key_path: value}."""
+    return {key_path: get_config_value(config, key_path, default) for key_path in key_paths}
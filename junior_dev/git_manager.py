@@ -1,22 +1,123 @@
+import os
+import shlex
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Tuple, Union
 
 GIT_COMMAND_TIMEOUT_SECONDS = 30
+GIT_QUERY_POOL_SIZE = 4
 PROTECTED_BRANCHES = {"master", "main"}
 
+# Repos already validated by an earlier GitManager; the evolution loop
+# constructs many short-lived managers on the same path, and repeats can
+# skip the filesystem check.
+_VALIDATED_REPOS: set = set()
+
+
+class _CatFileWorker:
+    """Long-lived `git cat-file --batch-check` process for object lookups.
+
+    Each resolve costs one pipe round-trip instead of a fork+exec per
+    query. Git plumbing is not thread safe, so callers keep one worker
+    per thread.
+    """
+
+    def __init__(self, repo_path: Path):
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch-check"],
+            cwd=str(repo_path),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True, bufsize=1,
+        )
+
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def resolve(self, ref: str) -> Optional[Tuple[str, str]]:
+        """Resolve a revision to (object_sha, object_type); None if unknown.
+
+        Raises OSError if the worker process has gone away mid-query.
+        """
+        self._proc.stdin.write(ref + "\n")
+        self._proc.stdin.flush()
+        line = self._proc.stdout.readline().strip()
+        if not line:
+            raise OSError("cat-file worker closed its stdout")
+        if line.endswith(" missing") or line.endswith(" ambiguous"):
+            return None
+        sha, obj_type = line.split()[:2]
+        return sha, obj_type
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=GIT_COMMAND_TIMEOUT_SECONDS)
+
 
 class GitManager:
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, cache_ttl: float = 0.0):
+        """cache_ttl > 0 caches read-only queries (current branch, branch
+        existence, branch list, commit hashes, status) for that many
+        seconds. Mutations through this manager invalidate the cache, but
+        changes made behind its back may go unseen for up to cache_ttl.
+        """
         self.repo_path = Path(repo_path).resolve()
-        if not self.repo_path.exists():
-            raise ValueError(f"Repository path does not exist: {repo_path}")
-        if not self._is_git_repo():
-            raise ValueError(f"Not a git repository: {repo_path}")
+        if str(self.repo_path) not in _VALIDATED_REPOS:
+            self._validate_repo(repo_path)
+            _VALIDATED_REPOS.add(str(self.repo_path))
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[Any, Tuple[float, Any]] = {}
+        self._cat_file_local = threading.local()
+        self._cat_file_workers: List[_CatFileWorker] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _validate_repo(self, original_path: str) -> None:
+        # One stat on .git (a directory, or a file for worktrees) answers
+        # both "does the repo exist" and "is it a git repo"; only the
+        # error path pays for a second check to pick the right message.
+        try:
+            os.stat(self.repo_path / ".git")
+        except OSError:
+            if not self.repo_path.exists():
+                raise ValueError(f"Repository path does not exist: {original_path}")
+            raise ValueError(f"Not a git repository: {original_path}")
+
+    def _cat_file_worker(self) -> Optional[_CatFileWorker]:
+        worker = getattr(self._cat_file_local, "worker", None)
+        if worker is None or not worker.alive():
+            try:
+                worker = _CatFileWorker(self.repo_path)
+            except OSError:
+                return None
+            self._cat_file_local.worker = worker
+            self._cat_file_workers.append(worker)
+        return worker
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=GIT_QUERY_POOL_SIZE)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for worker in self._cat_file_workers:
+            try:
+                worker.close()
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self._cat_file_workers.clear()
+
+    def __enter__(self):
+        return self
 
-    def _is_git_repo(self) -> bool:
-        git_dir = self.repo_path / ".git"
-        return git_dir.exists() or git_dir.is_file()
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _run_git(self, args: List[str], check: bool = True) -> subprocess.CompletedProcess:
         try:
@@ -31,47 +132,105 @@ class GitManager:
         except subprocess.TimeoutExpired:
             raise RuntimeError(f"Git command timed out after {GIT_COMMAND_TIMEOUT_SECONDS}s: {' '.join(args)}")
         except subprocess.CalledProcessError as e:
-            if check:
-                raise RuntimeError(f"Git command failed: {' '.join(args)}\n{e.stderr}")
-            return subprocess.CompletedProcess(
-                args=e.cmd, returncode=e.returncode,
-                stdout=e.stdout or "", stderr=e.stderr or "",
+            # Only reachable with check=True; check=False returns the
+            # CompletedProcess without raising.
+            raise RuntimeError(f"Git command failed: {' '.join(args)}\n{e.stderr}")
+
+    def _run_git_returncode(self, args: List[str]) -> int:
+        """Returncode-only git call: no output capture, buffering, or decode."""
+        try:
+            return subprocess.run(
+                ["git"] + args,
+                cwd=str(self.repo_path),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=GIT_COMMAND_TIMEOUT_SECONDS,
+            ).returncode
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Git command timed out after {GIT_COMMAND_TIMEOUT_SECONDS}s: {' '.join(args)}")
+
+    def _cached(self, key: Any, fn) -> Any:
+        if self.cache_ttl <= 0:
+            return fn()
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit is not None and now - hit[0] < self.cache_ttl:
+            return hit[1]
+        value = fn()
+        self._cache[key] = (now, value)
+        return value
+
+    def _invalidate_cache(self):
+        self._cache.clear()
+
+    def _run_shell(self, script: str) -> subprocess.CompletedProcess:
+        """Run several &&-chained git commands in one bash subprocess."""
+        try:
+            return subprocess.run(
+                ["bash", "-c", script],
+                cwd=str(self.repo_path),
+                capture_output=True,
+                text=True,
+                timeout=GIT_COMMAND_TIMEOUT_SECONDS,
             )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Git command timed out after {GIT_COMMAND_TIMEOUT_SECONDS}s: {script}")
 
     # ── Branch operations ───────────────────────────────────────────
 
     def get_current_branch(self) -> str:
+        return self._cached("current_branch", self._get_current_branch)
+
+    def _get_current_branch(self) -> str:
         result = self._run_git(["branch", "--show-current"])
         return result.stdout.strip()
 
     def branch_exists(self, branch_name: str) -> bool:
+        return self._cached(("branch_exists", branch_name), lambda: self._branch_exists(branch_name))
+
+    def _branch_exists(self, branch_name: str) -> bool:
         result = self._run_git(["branch", "--list", branch_name], check=False)
         return bool(result.stdout.strip())
 
     def create_branch(self, branch_name: str, from_branch: str = "master") -> bool:
-        if self.branch_exists(branch_name):
-            return False
-        self.checkout_branch(from_branch)
-        result = self._run_git(["checkout", "-b", branch_name], check=False)
+        # One subprocess instead of three (exists check, checkout base,
+        # checkout -b); exit 3 marks "already exists" so it maps to False
+        # like any other failure.
+        branch = shlex.quote(branch_name)
+        base = shlex.quote(from_branch)
+        result = self._run_shell(
+            f"if git rev-parse --verify --quiet refs/heads/{branch} > /dev/null; then exit 3; fi; "
+            f"git checkout {base} && git checkout -b {branch}"
+        )
+        self._invalidate_cache()
         return result.returncode == 0
 
     def checkout_branch(self, branch_name: str) -> bool:
-        result = self._run_git(["checkout", branch_name], check=False)
-        return result.returncode == 0
+        returncode = self._run_git_returncode(["checkout", branch_name])
+        self._invalidate_cache()
+        return returncode == 0
 
     def delete_branch(self, branch_name: str, force: bool = False) -> bool:
         if branch_name in PROTECTED_BRANCHES:
             return False
         flag = "-D" if force else "-d"
-        result = self._run_git(["branch", flag, branch_name], check=False)
-        return result.returncode == 0
+        returncode = self._run_git_returncode(["branch", flag, branch_name])
+        self._invalidate_cache()
+        return returncode == 0
 
     def list_branches(self, pattern: Optional[str] = None) -> List[str]:
-        args = ["branch", "--list"]
-        if pattern:
-            args.append(pattern)
-        result = self._run_git(args, check=False)
-        return [b.strip().lstrip("* ").strip() for b in result.stdout.split("\n") if b.strip()]
+        return self._cached(("list_branches", pattern), lambda: self._list_branches(pattern))
+
+    def _list_branches(self, pattern: Optional[str] = None) -> List[str]:
+        # for-each-ref emits bare short names (no "* " marker or padding),
+        # so one splitlines pass replaces the per-line stripping that
+        # parsing `git branch` output needed.
+        ref_pattern = f"refs/heads/{pattern}" if pattern else "refs/heads/"
+        result = self._run_git(
+            ["for-each-ref", "--format=%(refname:short)", ref_pattern],
+            check=False,
+        )
+        return [b for b in result.stdout.splitlines() if b]
 
     # ── Diff operations ─────────────────────────────────────────────
 
@@ -86,40 +245,128 @@ class GitManager:
         )
         return {"stats": result.stdout, "has_changes": bool(result.stdout.strip())}
 
+    def diff_and_stats(self, base_branch: str, compare_branch: str) -> Tuple[str, Dict[str, Any]]:
+        """get_diff + get_diff_stats for one branch pair, run in parallel.
+
+        Each query spawns its own git child, so the two just overlap
+        their subprocess waits.
+        """
+        pool = self._pool()
+        diff_future = pool.submit(self.get_diff, base_branch, compare_branch)
+        stats_future = pool.submit(self.get_diff_stats, base_branch, compare_branch)
+        return diff_future.result(), stats_future.result()
+
     # ── Staging & commit ────────────────────────────────────────────
 
     def stage_all(self) -> bool:
-        result = self._run_git(["add", "."], check=False)
-        return result.returncode == 0
+        returncode = self._run_git_returncode(["add", "."])
+        self._invalidate_cache()
+        return returncode == 0
 
     def stage_files(self, files: List[str]) -> bool:
-        result = self._run_git(["add"] + files, check=False)
+        """Stage the given paths, fed NUL-separated over stdin so the
+        list stays one git call no matter its size (never hits ARG_MAX)."""
+        if not files:
+            return True
+        try:
+            result = subprocess.run(
+                ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                cwd=str(self.repo_path),
+                input="\0".join(files),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                timeout=GIT_COMMAND_TIMEOUT_SECONDS,
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Git command timed out after {GIT_COMMAND_TIMEOUT_SECONDS}s: add --pathspec-from-file=-")
+        self._invalidate_cache()
         return result.returncode == 0
 
     def commit(self, message: str, allow_empty: bool = False) -> bool:
         args = ["commit", "-m", message]
         if allow_empty:
             args.append("--allow-empty")
-        result = self._run_git(args, check=False)
+        returncode = self._run_git_returncode(args)
+        self._invalidate_cache()
+        return returncode == 0
+
+    def stage_and_commit(self, message: str, allow_empty: bool = False) -> bool:
+        """stage_all + commit in a single subprocess call."""
+        commit_args = f"git commit -m {shlex.quote(message)}"
+        if allow_empty:
+            commit_args += " --allow-empty"
+        result = self._run_shell(f"git add . && {commit_args}")
+        self._invalidate_cache()
         return result.returncode == 0
 
     # ── Status & info ───────────────────────────────────────────────
 
     def has_uncommitted_changes(self) -> bool:
-        result = self._run_git(["status", "--porcelain"], check=False)
-        return bool(result.stdout.strip())
+        return self._cached("status", self._has_uncommitted_changes)
+
+    def _has_uncommitted_changes(self) -> bool:
+        # The first byte of porcelain output answers the question; stop
+        # git there instead of draining the full status of a dirty tree.
+        # (diff-index --quiet would be cheaper still, but it ignores
+        # untracked files, which count as uncommitted changes here.)
+        proc = subprocess.Popen(
+            ["git", "status", "--porcelain"],
+            cwd=str(self.repo_path),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            first = proc.stdout.read(1)
+        finally:
+            proc.stdout.close()
+            proc.terminate()
+            try:
+                proc.wait(timeout=GIT_COMMAND_TIMEOUT_SECONDS)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        return bool(first)
 
     def get_commit_hash(self, branch: Optional[str] = None) -> Optional[str]:
+        return self._cached(("commit_hash", branch), lambda: self._get_commit_hash(branch))
+
+    def _get_commit_hash(self, branch: Optional[str] = None) -> Optional[str]:
         ref = branch or "HEAD"
+        worker = self._cat_file_worker()
+        if worker is not None:
+            try:
+                resolved = worker.resolve(ref)
+            except OSError:
+                pass  # worker died mid-query; fall back to a one-shot git
+            else:
+                return resolved[0] if resolved else None
         result = self._run_git(["rev-parse", ref], check=False)
         return result.stdout.strip() if result.returncode == 0 else None
 
+    def snapshot(self) -> Dict[str, Any]:
+        """One-call repo status: branch, branch list, dirtiness, HEAD.
+
+        The four independent read queries run concurrently on the shared
+        thread pool.
+        """
+        pool = self._pool()
+        futures = {
+            "current_branch": pool.submit(self.get_current_branch),
+            "branches": pool.submit(self.list_branches),
+            "has_uncommitted_changes": pool.submit(self.has_uncommitted_changes),
+            "commit_hash": pool.submit(self.get_commit_hash),
+        }
+        return {name: future.result() for name, future in futures.items()}
+
     # ── Reset & clean ───────────────────────────────────────────────
 
     def reset_hard(self, branch: str = "HEAD") -> bool:
-        result = self._run_git(["reset", "--hard", branch], check=False)
-        return result.returncode == 0
+        returncode = self._run_git_returncode(["reset", "--hard", branch])
+        self._invalidate_cache()
+        return returncode == 0
 
     def clean_untracked(self) -> bool:
-        result = self._run_git(["clean", "-fd"], check=False)
-        return result.returncode == 0
+        returncode = self._run_git_returncode(["clean", "-fd"])
+        self._invalidate_cache()
+        return returncode == 0
@@ -1,9 +1,19 @@
+import asyncio
+import hashlib
+import inspect
+import json
 import random
 import re
+import threading
 import time
 import traceback
-from typing import Tuple, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Optional
+from dataclasses import dataclass
+
+import numpy as np
+
+from junior_dev.judge_cache import JudgeCache
 
 try:
     from shinka.llm import LLMClient
@@ -11,9 +21,41 @@ try:
 except ImportError:
     SHINKA_AVAILABLE = False
 
-SWAP_PROBABILITY = 0.5
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 MAX_TIE_RETRIES = 2
 MAX_CONTEXT_VALUE_LENGTH = 1000
+MAX_BATCH_PAIRS = 8
+
+# Compiled once: these run on every judgment, and the module-level patterns
+# also skip the re-cache lookup per call.
+_RE_CANDIDATE = re.compile(r'^candidate:\s*(first|second)\s*$', re.IGNORECASE | re.MULTILINE)
+_RE_CONFIDENCE = re.compile(r'^confidence:\s*([0-9]*\.?[0-9]+)\s*$', re.IGNORECASE | re.MULTILINE)
+_RE_FLOAT = re.compile(r'[0-9]*\.?[0-9]+')
+_RE_JSON_ARRAY = re.compile(r'\[.*\]', re.DOTALL)
+_RE_JSON_OBJECT = re.compile(r'\{.*\}', re.DOTALL)
+
+JUDGE_STRUCTURED_SYSTEM_PROMPT = """You are an expert software architect and code reviewer. You compare two diffs (patches from a common base branch) and decide which better achieves the stated evolution objective, judging faithfulness to the objective first, then correctness and completeness, then code quality. Do not prefer a diff for being longer; do not reward scope creep; do not penalize minimal diffs that fully achieve the objective. You MUST choose one winner — ties are not allowed.
+
+Respond with ONLY a JSON object in this exact shape:
+
+{"candidate": "first", "confidence": 0.8, "explanation": "..."}
+
+Where "candidate" is exactly "first" or "second", "confidence" is a float between 0.0 and 1.0, and "explanation" briefly justifies the choice. No markdown, no text outside the JSON object.
+"""
+
+JUDGE_BATCH_SYSTEM_PROMPT = """You are an expert software architect and code reviewer. You will be given several numbered pairs of diffs (patches from a common base branch). For each pair, independently decide which diff better achieves the stated evolution objective, using the same criteria for every pair: faithfulness to the objective first, then correctness and completeness, then code quality. Do not prefer a diff for being longer; do not reward scope creep; do not penalize minimal diffs that fully achieve the objective. You MUST choose one winner per pair — ties are not allowed.
+
+Respond with ONLY a JSON array, one object per pair, in this exact shape:
+
+[{"index": 0, "winner": "first", "confidence": 0.8, "explanation": "..."}, ...]
+
+Where "winner" is exactly "first" or "second", "confidence" is a float between 0.0 and 1.0, and "explanation" briefly justifies the choice. Include every pair exactly once. No markdown, no text outside the JSON array.
+"""
 
 JUDGE_SYSTEM_PROMPT = """You are an expert software architect and code reviewer. You compare two diffs (patches from a common base branch) and decide which better achieves the stated evolution objective.
 
@@ -45,6 +87,8 @@ Where <candidate> is exactly "first" or "second" (lowercase), <confidence> is a
 
 @dataclass
 class JudgmentResult:
+    __slots__ = ("winner", "reasoning", "confidence", "llm_response", "cost", "timestamp")
+
     winner: str
     reasoning: str
     confidence: float
@@ -53,29 +97,183 @@ class JudgmentResult:
     timestamp: float
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Literal construction: asdict walks the dataclass reflectively
+        # and deep-copies every field, which adds up on judgment-heavy runs.
+        data = {
+            "winner": self.winner,
+            "reasoning": self.reasoning,
+            "confidence": self.confidence,
+            "cost": self.cost,
+            "timestamp": self.timestamp,
+        }
+        if self.llm_response:
+            data["llm_response"] = self.llm_response
+        return data
+
+
+class JudgmentLog:
+    """Column-oriented accumulator for many JudgmentResults.
+
+    Parallel columns (winners, confidence, cost, timestamps) plus an
+    interned reasoning table keep per-record overhead low when a
+    tournament aggregates thousands of judgments, and aggregate
+    statistics run as numpy reductions instead of Python loops.
+    """
+
+    def __init__(self):
+        self.winners: List[str] = []
+        self._confidence: List[float] = []
+        self._cost: List[float] = []
+        self._timestamp: List[float] = []
+        self._reasoning_ids: List[int] = []
+        self._reasoning_table: Dict[str, int] = {}
+        self._reasonings: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.winners)
+
+    def append(self, result: JudgmentResult):
+        self.winners.append(result.winner)
+        self._confidence.append(result.confidence)
+        self._cost.append(result.cost)
+        self._timestamp.append(result.timestamp)
+        reasoning_id = self._reasoning_table.get(result.reasoning)
+        if reasoning_id is None:
+            reasoning_id = len(self._reasonings)
+            self._reasoning_table[result.reasoning] = reasoning_id
+            self._reasonings.append(result.reasoning)
+        self._reasoning_ids.append(reasoning_id)
+
+    def reasoning(self, index: int) -> str:
+        """The reasoning text for record `index` (deduplicated storage)."""
+        return self._reasonings[self._reasoning_ids[index]]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        if not self.winners:
+            return {"count": 0, "total_cost": 0.0, "mean_confidence": 0.0}
+        return {
+            "count": len(self.winners),
+            "total_cost": float(np.sum(self._cost)),
+            "mean_confidence": float(np.mean(self._confidence)),
+        }
 
 
 class PairwiseJudge:
 
     def __init__(self, llm_model: str = "deepseek-reasoner", system_prompt: Optional[str] = None,
-                 temperature: float = 0.0, max_tokens: int = 2000):
+                 temperature: float = 0.0, max_tokens: int = 2000,
+                 max_candidate_chars: Optional[int] = None,
+                 cache: Optional[JudgeCache] = None,
+                 structured_output: bool = False):
         self.llm_model = llm_model
         self.system_prompt = system_prompt or JUDGE_SYSTEM_PROMPT
         self.temperature = temperature
         self.max_tokens = max_tokens
-
+        # When set, each candidate embedded in a prompt is middle-cut to
+        # this many characters, bounding token cost per judgment.
+        self.max_candidate_chars = max_candidate_chars
+        # Opt-in provider JSON mode: a guaranteed-parseable verdict skips
+        # the tie-retry loop entirely (text parsing stays as the fallback).
+        self.structured_output = structured_output
+
+        self._http_client = None
         if SHINKA_AVAILABLE and llm_model != "mock":
-            self.llm = LLMClient(model_names=[llm_model], temperatures=temperature)
+            self.llm = LLMClient(model_names=[llm_model], temperatures=temperature,
+                                 **self._http_client_kwargs())
         else:
             self.llm = None
         self.total_comparisons = 0
         self.total_cost = 0.0
+        self._stats_lock = threading.Lock()
+        # At temperature 0 the LLM is deterministic, so identical judgments
+        # can be replayed from memory instead of re-paying the call; an
+        # optional JudgeCache adds cross-run persistence on the same keys.
+        self._result_cache: Optional[Dict[str, Tuple[str, str]]] = {} if temperature == 0.0 else None
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.prefilter_hits = 0
         self.log_file = None  # set externally to write verbose output to a file
 
+    def _http_client_kwargs(self) -> Dict[str, Any]:
+        """A shared keep-alive httpx client for the LLM wrapper, when both
+        sides support it.
+
+        Reusing one pooled connection across compare() calls drops the
+        TCP+TLS handshake from every judge round-trip. Returns {} when
+        httpx is not installed or LLMClient accepts no client argument.
+        """
+        if not HTTPX_AVAILABLE:
+            return {}
+        try:
+            params = inspect.signature(LLMClient).parameters
+        except (TypeError, ValueError):
+            return {}
+        for name in ("http_client", "client", "session"):
+            if name in params:
+                try:
+                    self._http_client = httpx.Client(
+                        http2=True,
+                        timeout=httpx.Timeout(60.0, connect=5.0),
+                        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+                    )
+                except ImportError:  # http2 needs the h2 extra
+                    self._http_client = httpx.Client(
+                        timeout=httpx.Timeout(60.0, connect=5.0),
+                        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+                    )
+                return {name: self._http_client}
+        return {}
+
+    def close(self):
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def compare(self, task_spec: str, candidate_a: str, candidate_b: str,
                 context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
-        swapped = random.random() < SWAP_PROBABILITY
+        if self.llm is None:
+            # Mock backend: skip the swap, prompt build, and response parse
+            # entirely. The winner stays random so position-bias and no-tie
+            # tests keep their distribution.
+            with self._stats_lock:
+                self.total_comparisons += 1
+            return random.choice(["a", "b"]), "Mock response for testing. Randomly selected winner."
+
+        trivial = self._trivial_verdict(candidate_a, candidate_b)
+        if trivial is not None:
+            winner, reasoning = trivial
+            with self._stats_lock:
+                self.total_comparisons += 1
+                self.prefilter_hits += 1
+            return winner, reasoning
+
+        cache_key = None
+        if self._result_cache is not None:
+            cache_key = self._cache_key(task_spec, candidate_a, candidate_b, context)
+            cached = self._result_cache.get(cache_key)
+            if cached is None and self.cache is not None:
+                stored = self.cache.get(cache_key)
+                if stored is not None:
+                    cached = (stored["winner"], stored["reasoning"])
+                    self._result_cache[cache_key] = cached
+            if cached is not None:
+                canonical_winner, reasoning = cached
+                winner = self._from_canonical(canonical_winner, candidate_a, candidate_b)
+                with self._stats_lock:
+                    self.total_comparisons += 1
+                    self.cache_hits += 1
+                return winner, reasoning
+            with self._stats_lock:
+                self.cache_misses += 1
+
+        swapped = self._swap_bit(candidate_a, candidate_b)
         first, second = (candidate_b, candidate_a) if swapped else (candidate_a, candidate_b)
 
         user_prompt = self._build_prompt(task_spec, first, second, context)
@@ -84,7 +282,18 @@ class PairwiseJudge:
         winner_presented = "tie"
         reasoning = ""
 
+        if self.structured_output:
+            structured = self._query_llm_structured(user_prompt)
+            if structured is not None:
+                winner_presented, reasoning, confidence, cost = structured
+                self._log("\n--- Judge LLM Structured Response ---")
+                self._log(f"--- Parsed: winner={winner_presented}, confidence={confidence:.2f}, swapped={swapped} ---\n")
+
+        # Text path (and fallback when structured output is unavailable):
+        # retry on parse failure up to MAX_TIE_RETRIES.
         for attempt in range(MAX_TIE_RETRIES):
+            if winner_presented != "tie":
+                break
             llm_response, cost = self._query_llm(user_prompt)
             winner_presented, reasoning, confidence = self._parse_response(llm_response)
 
@@ -94,8 +303,6 @@ class PairwiseJudge:
 
             if winner_presented == "tie":
                 print(f"  [judge] Parse failed on attempt {attempt + 1}, retrying...")
-            if winner_presented != "tie":
-                break
 
         if winner_presented == "tie":
             winner_presented = random.choice(["first", "second"])
@@ -107,11 +314,109 @@ class PairwiseJudge:
         else:
             winner = {"first": "a", "second": "b"}[winner_presented]
 
-        self.total_comparisons += 1
-        self.total_cost += cost
+        with self._stats_lock:
+            self.total_comparisons += 1
+            self.total_cost += cost
+
+        if cache_key is not None:
+            canonical = (self._from_canonical(winner, candidate_a, candidate_b), reasoning)
+            self._result_cache[cache_key] = canonical
+            if self.cache is not None:
+                self.cache.put(cache_key, {"winner": canonical[0], "reasoning": canonical[1]})
 
         return winner, reasoning
 
+    def _cache_key(self, task_spec: str, candidate_a: str, candidate_b: str,
+                   context: Optional[Dict[str, Any]]) -> str:
+        """Hash of the swap-normalized prompt, so (a, b) and (b, a) share
+        one entry regardless of the random presentation order."""
+        lo, hi = sorted((candidate_a, candidate_b))
+        canonical_prompt = self._build_prompt(task_spec, lo, hi, context)
+        return hashlib.blake2b(
+            (self.llm_model + "\x00" + self.system_prompt + "\x00" + canonical_prompt).encode(),
+            digest_size=16,
+        ).hexdigest()
+
+    @staticmethod
+    def _trivial_verdict(candidate_a: str, candidate_b: str) -> Optional[Tuple[str, str]]:
+        """Free verdicts for degenerate pairs, skipping the LLM entirely.
+
+        Identical candidates pick 'a' deterministically — ties are not
+        part of the comparison API — and an empty diff loses to a
+        non-empty one.
+        """
+        if candidate_a == candidate_b:
+            return "a", "Prefilter: candidates are identical; no LLM call needed."
+        a_empty = not candidate_a.strip()
+        b_empty = not candidate_b.strip()
+        if a_empty and not b_empty:
+            return "b", "Prefilter: first candidate diff is empty."
+        if b_empty and not a_empty:
+            return "a", "Prefilter: second candidate diff is empty."
+        return None
+
+    @staticmethod
+    def _swap_bit(candidate_a: str, candidate_b: str) -> bool:
+        """Deterministic presentation-order swap.
+
+        Hashing the pair keeps half of all pairs swapped (the anti
+        position-bias property a random coin gave us) while making
+        identical inputs build identical prompts, so verdict caching can
+        hit and runs are reproducible.
+        """
+        digest = hashlib.blake2b((candidate_a + "\x00" + candidate_b).encode(), digest_size=1)
+        return bool(digest.digest()[0] & 1)
+
+    @staticmethod
+    def _from_canonical(winner: str, candidate_a: str, candidate_b: str) -> str:
+        """Remap a winner between caller order and lexicographic order.
+
+        The mapping is its own inverse, so it serves both directions.
+        """
+        if candidate_a <= candidate_b:
+            return winner
+        return {"a": "b", "b": "a"}[winner]
+
+    async def compare_async(self, task_spec: str, candidate_a: str, candidate_b: str,
+                            context: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """Async wrapper around compare. The LLM client is synchronous, so
+        the blocking call runs on the default executor; concurrency comes
+        from gathering several of these (see compare_batch)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: self.compare(task_spec, candidate_a, candidate_b, context),
+        )
+
+    async def compare_batch(self, task_spec: str, pairs: List[Tuple[str, str]],
+                            context: Optional[Dict[str, Any]] = None,
+                            max_concurrency: int = 8) -> List[Tuple[str, str]]:
+        """Judge all pairs concurrently with at most max_concurrency LLM
+        calls in flight, preserving pair order in the results."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def judged(a: str, b: str) -> Tuple[str, str]:
+            async with semaphore:
+                return await self.compare_async(task_spec, a, b, context)
+
+        return list(await asyncio.gather(*(judged(a, b) for a, b in pairs)))
+
+    def compare_many(self, task_spec: str, pairs: List[Tuple[str, str]],
+                     context: Optional[Dict[str, Any]] = None,
+                     max_concurrency: int = 8) -> List[Tuple[str, str]]:
+        """Run compare over many pairs with up to max_concurrency in flight.
+
+        Each pair keeps its own independent order swap. Results are
+        returned in pair order. Wall-clock scales roughly as
+        len(pairs) / max_concurrency since comparisons are LLM-bound.
+        """
+        if not pairs:
+            return []
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(pool.map(
+                lambda pair: self.compare(task_spec, pair[0], pair[1], context),
+                pairs,
+            ))
+
     def compare_detailed(self, task_spec: str, candidate_a: str, candidate_b: str,
                          context: Optional[Dict[str, Any]] = None) -> JudgmentResult:
         cost_before = self.total_cost
@@ -127,14 +432,292 @@ class PairwiseJudge:
             timestamp=time.time(),
         )
 
+    def judge_batch(self, task_spec: str, pairs: List[Tuple[str, str]],
+                    context: Optional[Dict[str, Any]] = None) -> List[JudgmentResult]:
+        """Judge several (candidate_a, candidate_b) pairs, packing up to
+        MAX_BATCH_PAIRS per LLM request to amortize per-call overhead.
+
+        Each pair is swapped independently to avoid position bias. A chunk
+        whose JSON response cannot be parsed falls back to per-pair compare.
+        """
+        results: List[JudgmentResult] = []
+        for start in range(0, len(pairs), MAX_BATCH_PAIRS):
+            chunk = pairs[start:start + MAX_BATCH_PAIRS]
+            results.extend(self._judge_batch_chunk(task_spec, chunk, context))
+        return results
+
+    def compare_multi(self, triples: List[Tuple[str, str, str]],
+                      context: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str]]:
+        """Judge (objective, candidate_a, candidate_b) triples.
+
+        Pairs sharing an objective are packed into multi-pair LLM calls
+        through judge_batch (MAX_BATCH_PAIRS per request), amortizing the
+        system prompt and per-request overhead; results come back in
+        input order.
+        """
+        by_objective: Dict[str, List[int]] = {}
+        for idx, (objective, _, _) in enumerate(triples):
+            by_objective.setdefault(objective, []).append(idx)
+
+        results: List[Tuple[str, str]] = [("", "")] * len(triples)
+        for objective, indices in by_objective.items():
+            pairs = [(triples[i][1], triples[i][2]) for i in indices]
+            for i, judged in zip(indices, self.judge_batch(objective, pairs, context)):
+                results[i] = (judged.winner, judged.reasoning)
+        return results
+
+    def _judge_batch_chunk(self, task_spec: str, pairs: List[Tuple[str, str]],
+                           context: Optional[Dict[str, Any]]) -> List[JudgmentResult]:
+        if not self.llm:
+            return [self.compare_detailed(task_spec, a, b, context) for a, b in pairs]
+
+        swaps = [self._swap_bit(a, b) for a, b in pairs]
+        user_prompt = self._build_batch_prompt(task_spec, pairs, swaps, context)
+        llm_response, cost = self._query_llm(user_prompt, system_msg=JUDGE_BATCH_SYSTEM_PROMPT)
+        parsed = self._parse_batch_response(llm_response, len(pairs))
+
+        self._log("\n--- Judge LLM Batch Response ---")
+        self._log(llm_response)
+        self._log(f"--- Parsed: {'failed' if parsed is None else f'{len(parsed)} verdicts'} ---\n")
+
+        if parsed is None:
+            print("  [judge] Batch parse failed, falling back to per-pair comparisons")
+            return [self.compare_detailed(task_spec, a, b, context) for a, b in pairs]
+
+        with self._stats_lock:
+            self.total_comparisons += len(pairs)
+            self.total_cost += cost
+        per_pair_cost = cost / len(pairs)
+        now = time.time()
+
+        results = []
+        for (winner_presented, explanation, confidence), swapped in zip(parsed, swaps):
+            if swapped:
+                winner = {"first": "b", "second": "a"}[winner_presented]
+            else:
+                winner = {"first": "a", "second": "b"}[winner_presented]
+            results.append(JudgmentResult(
+                winner=winner,
+                reasoning=explanation,
+                confidence=confidence,
+                llm_response="",
+                cost=per_pair_cost,
+                timestamp=now,
+            ))
+        return results
+
+    def _build_batch_prompt(self, task_spec: str, pairs: List[Tuple[str, str]],
+                            swaps: List[bool], context: Optional[Dict[str, Any]] = None) -> str:
+        objective = task_spec
+        if context and "evolution_objective" in context:
+            objective = context["evolution_objective"]
+
+        parts = [f"Evolution objective:\n{objective}\n"]
+        for i, ((a, b), swapped) in enumerate(zip(pairs, swaps)):
+            first, second = (b, a) if swapped else (a, b)
+            first = self._truncate_candidate(first)
+            second = self._truncate_candidate(second)
+            parts.append(f"""
+=== Pair {i} ===
+First candidate (diff from base):
+{first}
+
+Second candidate (diff from base):
+{second}
+""")
+        parts.append("\nFor each pair, which diff would better achieve the evolution objective? "
+                     "Judge the outcome, not diff size. Respond with only the JSON array "
+                     "described above, one object per pair.")
+        return "".join(parts)
+
+    def _parse_batch_response(self, response: str, expected: int) -> Optional[List[Tuple[str, str, float]]]:
+        match = _RE_JSON_ARRAY.search(response)
+        if not match:
+            return None
+        try:
+            items = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(items, list):
+            return None
+
+        by_index: Dict[int, Tuple[str, str, float]] = {}
+        try:
+            for item in items:
+                winner = str(item.get("winner", "")).lower()
+                if winner not in ("first", "second"):
+                    return None
+                confidence = max(0.0, min(1.0, float(item.get("confidence", 0.5))))
+                by_index[int(item["index"])] = (winner, str(item.get("explanation", "")), confidence)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+        if sorted(by_index) != list(range(expected)):
+            return None
+        return [by_index[i] for i in range(expected)]
+
+    def _truncate_candidate(self, candidate: str) -> str:
+        """Cut a candidate down to max_candidate_chars; no-op when the
+        limit is unset.
+
+        Diffs are trimmed hunk by hunk so the most-changed hunks survive
+        intact; anything else falls back to a head-and-tail middle cut.
+        """
+        limit = self.max_candidate_chars
+        if limit is None or len(candidate) <= limit:
+            return candidate
+        if "@@" in candidate:
+            return self._trim_diff(candidate, limit)
+        keep_each = limit // 2
+        removed = len(candidate) - limit
+        return (
+            candidate[:keep_each]
+            + f"\n\n... [TRUNCATED {removed:,} characters] ...\n\n"
+            + candidate[-keep_each:]
+        )
+
+    @staticmethod
+    def _trim_diff(diff: str, max_chars: int) -> str:
+        """Trim a unified diff to roughly max_chars, hunk-aware.
+
+        File headers always survive so the judge sees which files each
+        candidate touches; hunks compete for the remaining budget by
+        changed-line count, and dropped hunks leave an omission marker
+        in place. The budget is characters (~4 per token), since no
+        tokenizer is available as a dependency.
+        """
+        segments: List[Tuple[str, List[str]]] = []  # (kind, lines)
+        current_kind = "header"
+        current: List[str] = []
+        for line in diff.splitlines():
+            if line.startswith("@@") or line.startswith("diff --git"):
+                if current:
+                    segments.append((current_kind, current))
+                current_kind = "hunk" if line.startswith("@@") else "header"
+                current = [line]
+            else:
+                current.append(line)
+        if current:
+            segments.append((current_kind, current))
+
+        budget = max_chars
+        for kind, lines in segments:
+            if kind == "header":
+                budget -= sum(len(l) + 1 for l in lines)
+
+        scored = []
+        for idx, (kind, lines) in enumerate(segments):
+            if kind == "hunk":
+                changed = sum(1 for l in lines[1:] if l[:1] in "+-")
+                scored.append((changed, idx))
+        keep = set()
+        for changed, idx in sorted(scored, reverse=True):
+            size = sum(len(l) + 1 for l in segments[idx][1])
+            if size <= budget:
+                keep.add(idx)
+                budget -= size
+
+        parts: List[str] = []
+        omitted = 0
+        for idx, (kind, lines) in enumerate(segments):
+            if kind == "header" or idx in keep:
+                if omitted:
+                    parts.append(f"... [{omitted} hunk(s) omitted] ...")
+                    omitted = 0
+                parts.extend(lines)
+            else:
+                omitted += 1
+        if omitted:
+            parts.append(f"... [{omitted} hunk(s) omitted] ...")
+        return "\n".join(parts)
+
     def _log(self, msg: str):
         if self.log_file:
             self.log_file.write(msg + "\n")
             self.log_file.flush()
 
-    def _query_llm(self, user_prompt: str) -> Tuple[str, float]:
+    def _query_llm_stream(self, user_prompt: str, system_msg: str) -> Optional[Tuple[str, float]]:
+        """Stream the response and cancel the tail once it is parseable.
+
+        The judge format puts explanation first and confidence last, so
+        once a complete confidence line has arrived nothing useful is
+        left to generate. Only whole lines are matched, so a partially
+        streamed float never triggers the cancel. Returns None to fall
+        back to the blocking path if streaming fails.
+        """
+        try:
+            stream = self.llm.query_stream(msg=user_prompt, system_msg=system_msg)
+        except (OSError, TypeError, ValueError):
+            return None
+        chunks: List[str] = []
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                buffered = "".join(chunks)
+                complete_lines = buffered[:buffered.rfind("\n") + 1]
+                lowered = complete_lines.lower()
+                # Substring check first; the regex scans only run once both
+                # labels are at least present.
+                if ("candidate:" in lowered and "confidence:" in lowered
+                        and _RE_CANDIDATE.search(complete_lines)
+                        and _RE_CONFIDENCE.search(complete_lines)):
+                    close = getattr(stream, "close", None)
+                    if close is not None:
+                        close()
+                    break
+        except (OSError, TypeError, ValueError):
+            return None
+        if not chunks:
+            return None
+        return "".join(chunks), 0.0
+
+    def _query_llm_structured(self, user_prompt: str) -> Optional[Tuple[str, str, float, float]]:
+        """One JSON-mode call returning (winner, reasoning, confidence, cost).
+
+        Returns None when the client's query() does not accept a
+        response_format argument, or when the call or the JSON parse
+        fails — the caller then falls back to the text path.
+        """
+        try:
+            params = inspect.signature(self.llm.query).parameters
+        except (TypeError, ValueError):
+            return None
+        if "response_format" not in params:
+            return None
+        try:
+            response = self.llm.query(
+                msg=user_prompt,
+                system_msg=JUDGE_STRUCTURED_SYSTEM_PROMPT,
+                response_format={"type": "json_object"},
+            )
+        except TypeError:
+            return None
+        if response is None:
+            return None
+
+        match = _RE_JSON_OBJECT.search(response.content)
+        if not match:
+            return None
+        try:
+            item = json.loads(match.group(0))
+            winner = str(item["candidate"]).lower()
+            confidence = max(0.0, min(1.0, float(item.get("confidence", 0.5))))
+            reasoning = str(item.get("explanation", ""))
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+        if winner not in ("first", "second"):
+            return None
+        return winner, reasoning, confidence, getattr(response, "cost", 0.0)
+
+    def _query_llm(self, user_prompt: str, system_msg: Optional[str] = None) -> Tuple[str, float]:
         if self.llm:
-            response = self.llm.query(msg=user_prompt, system_msg=self.system_prompt)
+            # Streaming cancels the response tail, so only use it when no
+            # verbose log wants the complete response.
+            if self.log_file is None and hasattr(self.llm, "query_stream"):
+                streamed = self._query_llm_stream(user_prompt, system_msg or self.system_prompt)
+                if streamed is not None:
+                    return streamed
+            response = self.llm.query(msg=user_prompt, system_msg=system_msg or self.system_prompt)
             if response is None:
                 return self._mock_llm_response(), 0.0
             cost = response.cost if hasattr(response, "cost") else 0.0
@@ -147,54 +730,75 @@ class PairwiseJudge:
         if context and "evolution_objective" in context:
             objective = context["evolution_objective"]
 
-        prompt = f"""Evolution objective:
-{objective}
-
-First candidate (diff from base):
-{first}
-
-Second candidate (diff from base):
-{second}
-"""
+        # Cache-friendly layout: the content that is stable across a
+        # tournament (objective, then context keys in sorted order) leads,
+        # and the per-call diffs come last, so provider prefix caching can
+        # reuse the shared head. The full format specification lives in the
+        # system prompt; only a short reminder is repeated here.
+        parts = [f"Evolution objective:\n{objective}\n"]
         if context:
-            for key, value in context.items():
+            for key in sorted(context):
                 if key == "evolution_objective":
                     continue
-                if isinstance(value, str) and len(value) < MAX_CONTEXT_VALUE_LENGTH:
-                    prompt += f"\n{key}: {value}\n"
-                elif isinstance(value, (int, float, bool)):
-                    prompt += f"\n{key}: {value}\n"
+                value = context[key]
+                if isinstance(value, (int, float, bool)) or (
+                        isinstance(value, str) and len(value) < MAX_CONTEXT_VALUE_LENGTH):
+                    parts.append(f"\n{key}: {value}\n")
 
-        prompt += """
-Which diff, when applied to the base, would better achieve the evolution objective? Judge the outcome, not diff size.
-
-Formulate your judgment following this exact format:
+        parts.append(f"""
+First candidate (diff from base):
+{self._truncate_candidate(first)}
 
-explanation:<your reasoning>
-candidate:<candidate>
-confidence:<confidence>
+Second candidate (diff from base):
+{self._truncate_candidate(second)}
 
-Where <candidate> is replaced by exactly the word "first" or "second" (lowercase, no quotes), where <confidence> is a float between 0.0 and 1.0, and where <your reasoning> is a textual explanation of your decision. Respect the formatting (spaces, case, no markdown)."""
-        return prompt
+Which diff, when applied to the base, would better achieve the evolution objective? Judge the outcome, not diff size. Respond in the exact explanation/candidate/confidence format from your instructions.""")
+        return "".join(parts)
 
     def _parse_response(self, response: str) -> Tuple[str, str, float]:
-        # Parse candidate: first|second
+        # Cheap substring pre-check: an unstructured response (no labels at
+        # all) can skip the regex scan and take the defaults directly.
+        lowered = response.lower()
+        if ("explanation:" not in lowered and "candidate:" not in lowered
+                and "confidence:" not in lowered):
+            return "tie", response, 0.5
+
+        # One line-oriented pass: a field's body runs from its labelled line
+        # until the next labelled line, and the first occurrence of each
+        # label wins. Plain string scanning — no regex engine on this path.
+        fields: Dict[str, str] = {}
+        current_label: Optional[str] = None
+        body_lines: List[str] = []
+        for line in response.splitlines():
+            line_lowered = line.lower()
+            label = None
+            for candidate_label in ("explanation", "candidate", "confidence"):
+                if line_lowered.startswith(candidate_label + ":"):
+                    label = candidate_label
+                    break
+            if label is not None:
+                if current_label is not None and current_label not in fields:
+                    fields[current_label] = "\n".join(body_lines)
+                current_label = label
+                body_lines = [line.split(":", 1)[1]]
+            elif current_label is not None:
+                body_lines.append(line)
+        if current_label is not None and current_label not in fields:
+            fields[current_label] = "\n".join(body_lines)
+
         winner = "tie"
-        candidate_match = re.search(r'^candidate:\s*(first|second)\s*$', response, re.IGNORECASE | re.MULTILINE)
-        if candidate_match:
-            winner = candidate_match.group(1).lower()
+        candidate = fields.get("candidate", "").split("\n", 1)[0].strip().lower()
+        if candidate in ("first", "second"):
+            winner = candidate
 
-        # Parse confidence: float
         confidence = 0.5
-        confidence_match = re.search(r'^confidence:\s*([0-9]*\.?[0-9]+)\s*$', response, re.IGNORECASE | re.MULTILINE)
-        if confidence_match:
-            confidence = max(0.0, min(1.0, float(confidence_match.group(1))))
+        confidence_line = fields.get("confidence", "").split("\n", 1)[0].strip()
+        if _RE_FLOAT.fullmatch(confidence_line):
+            confidence = max(0.0, min(1.0, float(confidence_line)))
 
-        # Parse explanation: text (everything after "explanation:" until "candidate:" or end)
         reasoning = response
-        explanation_match = re.search(r'^explanation:\s*(.+?)(?=^candidate:|\Z)', response, re.IGNORECASE | re.DOTALL | re.MULTILINE)
-        if explanation_match:
-            reasoning = explanation_match.group(1).strip()
+        if "explanation" in fields:
+            reasoning = fields["explanation"].strip()
 
         return winner, reasoning, confidence
 
@@ -207,6 +811,9 @@ Where <candidate> is replaced by exactly the word "first" or "second" (lowercase
             "total_comparisons": self.total_comparisons,
             "total_cost": self.total_cost,
             "average_cost": self.total_cost / max(self.total_comparisons, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "prefilter_hits": self.prefilter_hits,
             "model": self.llm_model,
         }
 
@@ -0,0 +1,108 @@
+"""Persistent cache for LLM judge responses.
+
+Re-running an evaluation with identical inputs pays the full judge API
+cost each time. This module stores judge responses in a small SQLite
+database keyed by a content hash of the inputs, so reruns skip the API
+call entirely.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+DEFAULT_CACHE_PATH = "results/judge_cache.db"
+KEY_HEX_LENGTH = 24
+SQLITE_TIMEOUT_SECONDS = 30.0
+
+
+def make_key(**parts: Any) -> str:
+    """Build a stable cache key from keyword parts.
+
+    Parts are JSON-serialized with sorted keys so the same inputs always
+    hash identically, e.g. make_key(task_spec=..., program=..., model=...).
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()[:KEY_HEX_LENGTH]
+
+
+class JudgeCache:
+    """SQLite-backed key/value store for judge responses.
+
+    Values are JSON-serializable objects. WAL mode allows concurrent
+    readers while one process writes.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH):
+        self.db_path = str(db_path)
+        parent = Path(self.db_path).parent
+        if str(parent) not in ("", "."):
+            parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.db_path, timeout=SQLITE_TIMEOUT_SECONDS)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.OperationalError:
+            pass  # read-only filesystem; fall back to defaults
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS judge_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self.conn.execute(
+            "SELECT response FROM judge_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, response: Any):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO judge_cache (key, response, created) VALUES (?, ?, ?)",
+            (key, json.dumps(response), time.time()),
+        )
+        self.conn.commit()
+
+    def get_or_compute(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Return the cached response for key, computing and storing on miss."""
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        result = fn()
+        self.put(key, result)
+        return result
+
+    def clear(self):
+        self.conn.execute("DELETE FROM judge_cache")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_default_cache: Optional[JudgeCache] = None
+
+
+def get_or_compute(key: str, fn: Callable[[], Any]) -> Any:
+    """Module-level convenience using a shared cache at DEFAULT_CACHE_PATH."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = JudgeCache()
+    return _default_cache.get_or_compute(key, fn)
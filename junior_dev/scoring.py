@@ -1,12 +1,24 @@
+import json
+import queue
+import random
 import sqlite3
 import time
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Tuple, List, Optional, Dict, Any
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 from scipy.optimize import minimize
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # Score bounds for L-BFGS-B optimizer (prevents overflow)
 LOG_THETA_MIN = -15
 LOG_THETA_MAX = 15
@@ -16,10 +28,137 @@ DEFAULT_INITIAL_SCORE = 1.0
 SCORE_NORMALIZATION_TARGET = 1000
 EPSILON = 1e-12
 SQLITE_TIMEOUT_SECONDS = 30.0
+SQLITE_STATEMENT_CACHE_SIZE = 256
+SQLITE_READ_POOL_SIZE = 4
+# Below this many rows a full ORDER BY RANDOM() scan is cheaper than rowid
+# oversampling rounds.
+RANDOM_SAMPLE_MIN_ROWS = 1000
+SCORE_CACHE_CAPACITY = 4096
+
+# Hot-path SQL lives in module constants: sqlite3 keys its prepared-statement
+# cache on the exact string, so reusing the same object skips re-parsing.
+_SQL_SELECT_SCORE = "SELECT bt_score FROM bt_scores WHERE candidate_id = ?"
+_SQL_INSERT_CANDIDATE = (
+    "INSERT INTO bt_scores (candidate_id, bt_score, created_at, updated_at) VALUES (?, ?, ?, ?)"
+)
+_SQL_INSERT_CANDIDATE_IGNORE = _SQL_INSERT_CANDIDATE.replace(
+    "INSERT INTO", "INSERT OR IGNORE INTO"
+)
+_SQL_UPDATE_CANDIDATE = (
+    "UPDATE bt_scores SET num_comparisons = num_comparisons + 1, "
+    "wins = wins + ?, losses = losses + ?, ties = ties + ?, updated_at = ? "
+    "WHERE candidate_id = ?"
+)
+_SQL_UPDATE_SCORE = "UPDATE bt_scores SET bt_score = ?, updated_at = ? WHERE candidate_id = ?"
+# Single-statement get-or-create: the no-op DO UPDATE makes RETURNING fire
+# on conflict as well, yielding the existing score. Requires sqlite >= 3.35.
+_SQL_UPSERT_CANDIDATE_RETURNING = (
+    "INSERT INTO bt_scores (candidate_id, bt_score, created_at, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(candidate_id) DO UPDATE SET candidate_id = candidate_id RETURNING bt_score"
+)
+# Create-or-bump a candidate's stats row in one statement. bt_score is left
+# untouched on conflict (the refit owns it); RETURNING yields the score
+# already on record either way.
+_SQL_UPSERT_CANDIDATE_STATS = (
+    "INSERT INTO bt_scores (candidate_id, bt_score, num_comparisons, wins, losses, ties, "
+    "created_at, updated_at) VALUES (?, ?, 1, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(candidate_id) DO UPDATE SET "
+    "num_comparisons = num_comparisons + 1, "
+    "wins = wins + excluded.wins, losses = losses + excluded.losses, "
+    "ties = ties + excluded.ties, updated_at = excluded.updated_at "
+    "RETURNING bt_score"
+)
+_SQLITE_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+# Generated columns landed in sqlite 3.31.
+_SQLITE_SUPPORTS_GENERATED = sqlite3.sqlite_version_info >= (3, 31, 0)
+
+# Winner label -> Bradley-Terry outcome from candidate_a's perspective.
+_SCORE_MAP = {'a': 1.0, 'tie': 0.5, 'b': 0.0}
+
+# (winner, perspective) -> (win, loss, tie) increments; covers all six
+# outcomes so _update_candidate is a single lookup instead of three
+# boolean-to-int conversions.
+_WLT_INCR = {
+    ('a', 'a'): (1, 0, 0),
+    ('b', 'a'): (0, 1, 0),
+    ('tie', 'a'): (0, 0, 1),
+    ('a', 'b'): (0, 1, 0),
+    ('b', 'b'): (1, 0, 0),
+    ('tie', 'b'): (0, 0, 1),
+}
+
+_WIN_RATE_EXPR = (
+    "(wins + 0.5 * ties) / CASE WHEN num_comparisons = 0 THEN 1 ELSE num_comparisons END"
+)
+_SQL_PAIR_EXISTS = "SELECT 1 FROM comparisons WHERE candidate_a = ? AND candidate_b = ?"
+_SQL_SELECT_PAIR = "SELECT * FROM comparisons WHERE candidate_a = ? AND candidate_b = ?"
+_SQL_SELECT_CANDIDATE_IDS = "SELECT candidate_id FROM bt_scores"
+_SQL_SELECT_OUTCOMES = "SELECT candidate_a, candidate_b, winner FROM comparisons"
+_SQL_INSERT_COMPARISON = (
+    "INSERT INTO comparisons "
+    "(candidate_a, candidate_b, winner, score_a_before, score_b_before, "
+    "score_a_after, score_b_after, judge_reasoning, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_COMPARISON_IGNORE = _SQL_INSERT_COMPARISON.replace(
+    "INSERT INTO", "INSERT OR IGNORE INTO"
+)
+_SQL_UPDATE_COMPARISON_AFTER = (
+    "UPDATE comparisons SET score_a_after = ?, score_b_after = ? "
+    "WHERE candidate_a = ? AND candidate_b = ?"
+)
+
+# Explicit column lists in dataclass field order, so positional rows from a
+# row_factory=None cursor can be splatted straight into the constructors.
+_BT_SCORE_COLUMNS = (
+    "candidate_id, bt_score, num_comparisons, wins, losses, ties, created_at, updated_at"
+)
+_COMPARISON_COLUMNS = (
+    "candidate_a, candidate_b, winner, score_a_before, score_b_before, "
+    "score_a_after, score_b_after, judge_reasoning, timestamp"
+)
+# OR across two columns defeats index selection; UNION ALL lets each branch
+# use its own index, and canonical pair order guarantees the branches are
+# disjoint.
+_SQL_HISTORY = (
+    f"SELECT {_COMPARISON_COLUMNS} FROM comparisons WHERE candidate_a = ? "
+    f"UNION ALL "
+    f"SELECT {_COMPARISON_COLUMNS} FROM comparisons WHERE candidate_b = ? "
+    "ORDER BY timestamp DESC"
+)
+
+
+def _isoformat(ts: float) -> str:
+    """ISO-8601 timestamp without constructing a datetime object.
+
+    Matches datetime.fromtimestamp(ts).isoformat(): microseconds are only
+    appended when non-zero.
+    """
+    base = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts))
+    micros = min(int(round((ts % 1.0) * 1e6)), 999999)
+    return f"{base}.{micros:06d}" if micros else base
+
+
+def _canonical_pair(candidate_a: str, candidate_b: str, winner: str) -> Tuple[str, str, str, bool]:
+    """Order a pair as (min, max) so each pair has one canonical row.
+
+    Returns (a, b, winner, swapped) with the winner remapped when the
+    candidates were exchanged.
+    """
+    if candidate_b < candidate_a:
+        winner = 'b' if winner == 'a' else 'a' if winner == 'b' else winner
+        return candidate_b, candidate_a, winner, True
+    return candidate_a, candidate_b, winner, False
 
 
 @dataclass
 class BTStats:
+    # Manual __slots__ (dataclass slots=True needs 3.10; setup.py supports
+    # 3.8): drops the per-instance __dict__, which matters when exports
+    # inflate one instance per row.
+    __slots__ = ('candidate_id', 'bt_score', 'num_comparisons', 'wins',
+                 'losses', 'ties', 'created_at', 'updated_at')
+
     candidate_id: str
     bt_score: float
     num_comparisons: int
@@ -33,16 +172,28 @@ class BTStats:
     def win_rate(self) -> float:
         return (self.wins + 0.5 * self.ties) / self.num_comparisons if self.num_comparisons else 0.0
     
-    def to_dict(self) -> Dict[str, Any]:
-        data = asdict(self)
-        data['win_rate'] = self.win_rate
-        data['created_at'] = datetime.fromtimestamp(self.created_at).isoformat()
-        data['updated_at'] = datetime.fromtimestamp(self.updated_at).isoformat()
-        return data
+    def to_dict(self, iso_dates: bool = True) -> Dict[str, Any]:
+        # Literal dict: asdict's reflective walk and per-field deepcopy
+        # are wasted on a flat dataclass.
+        return {
+            'candidate_id': self.candidate_id,
+            'bt_score': self.bt_score,
+            'num_comparisons': self.num_comparisons,
+            'wins': self.wins,
+            'losses': self.losses,
+            'ties': self.ties,
+            'created_at': _isoformat(self.created_at) if iso_dates else self.created_at,
+            'updated_at': _isoformat(self.updated_at) if iso_dates else self.updated_at,
+            'win_rate': self.win_rate,
+        }
 
 
 @dataclass
 class ComparisonResult:
+    __slots__ = ('candidate_a', 'candidate_b', 'winner', 'score_a_before',
+                 'score_b_before', 'score_a_after', 'score_b_after',
+                 'judge_reasoning', 'timestamp')
+
     candidate_a: str
     candidate_b: str
     winner: str
@@ -53,32 +204,76 @@ class ComparisonResult:
     judge_reasoning: str
     timestamp: float
     
-    def to_dict(self) -> Dict[str, Any]:
-        data = asdict(self)
-        data['score_change_a'] = self.score_a_after - self.score_a_before
-        data['score_change_b'] = self.score_b_after - self.score_b_before
-        data['timestamp'] = datetime.fromtimestamp(self.timestamp).isoformat()
-        return data
+    def to_dict(self, iso_dates: bool = True) -> Dict[str, Any]:
+        return {
+            'candidate_a': self.candidate_a,
+            'candidate_b': self.candidate_b,
+            'winner': self.winner,
+            'score_a_before': self.score_a_before,
+            'score_b_before': self.score_b_before,
+            'score_a_after': self.score_a_after,
+            'score_b_after': self.score_b_after,
+            'judge_reasoning': self.judge_reasoning,
+            'timestamp': _isoformat(self.timestamp) if iso_dates else self.timestamp,
+            'score_change_a': self.score_a_after - self.score_a_before,
+            'score_change_b': self.score_b_after - self.score_b_before,
+        }
+
+
+def _score_row_to_dict(row: Tuple, iso_dates: bool) -> Dict[str, Any]:
+    """Build a BTStats.to_dict()-shaped dict straight from a positional row."""
+    candidate_id, bt_score, num_comparisons, wins, losses, ties, created_at, updated_at = row
+    return {
+        'candidate_id': candidate_id,
+        'bt_score': bt_score,
+        'num_comparisons': num_comparisons,
+        'wins': wins,
+        'losses': losses,
+        'ties': ties,
+        'created_at': _isoformat(created_at) if iso_dates else created_at,
+        'updated_at': _isoformat(updated_at) if iso_dates else updated_at,
+        'win_rate': (wins + 0.5 * ties) / num_comparisons if num_comparisons else 0.0,
+    }
+
+
+def _comparison_row_to_dict(row: Tuple, iso_dates: bool) -> Dict[str, Any]:
+    """Build a ComparisonResult.to_dict()-shaped dict from a positional row."""
+    (candidate_a, candidate_b, winner, score_a_before, score_b_before,
+     score_a_after, score_b_after, judge_reasoning, timestamp) = row
+    return {
+        'candidate_a': candidate_a,
+        'candidate_b': candidate_b,
+        'winner': winner,
+        'score_a_before': score_a_before,
+        'score_b_before': score_b_before,
+        'score_a_after': score_a_after,
+        'score_b_after': score_b_after,
+        'judge_reasoning': judge_reasoning,
+        'timestamp': _isoformat(timestamp) if iso_dates else timestamp,
+        'score_change_a': score_a_after - score_a_before,
+        'score_change_b': score_b_after - score_b_before,
+    }
 
 
 def _bt_neg_log_likelihood(
     log_theta: np.ndarray,
-    candidates: List[str],
-    comparisons: List[Tuple[str, str, float]],
-    idx_map: Dict[str, int],
+    idx_a: np.ndarray,
+    idx_b: np.ndarray,
+    scores: np.ndarray,
 ) -> float:
-    """Negative log-likelihood for Bradley-Terry. log_theta keeps strengths positive."""
-    theta = np.exp(np.clip(log_theta, -LOG_THETA_CLIP, LOG_THETA_CLIP)) + EPSILON
-    nll = 0.0
-    for a, b, score in comparisons:
-        i, j = idx_map[a], idx_map[b]
-        pi, pj = theta[i], theta[j]
-        s = pi + pj
-        if s <= 0:
-            return 1e10
-        # LL = score*log(pi/s) + (1-score)*log(pj/s). NLL = -LL.
-        nll -= score * (np.log(pi) - np.log(s)) + (1.0 - score) * (np.log(pj) - np.log(s))
-    return nll
+    """Negative log-likelihood for Bradley-Terry. log_theta keeps strengths positive.
+
+    Comparisons are pre-materialized into index/score arrays so each
+    evaluation is a handful of vectorized ufunc passes instead of a Python
+    loop over pairs. Everything stays in log-space: log(theta_i + theta_j)
+    is logaddexp of the log-strengths, so no exp/log round trip, no clip
+    and no epsilon guard are needed, and logaddexp is overflow-safe by
+    construction.
+    """
+    lt_a = log_theta[idx_a]
+    lt_b = log_theta[idx_b]
+    nll = np.sum(np.logaddexp(lt_a, lt_b)) - np.sum(scores * lt_a + (1.0 - scores) * lt_b)
+    return float(nll)
 
 
 def compute_bt_mm_scipy(
@@ -89,11 +284,15 @@ def compute_bt_mm_scipy(
         return {}
     n = len(candidates)
     idx_map = {c: i for i, c in enumerate(candidates)}
+    m = len(comparisons)
+    idx_a = np.fromiter((idx_map[a] for a, _, _ in comparisons), dtype=np.intp, count=m)
+    idx_b = np.fromiter((idx_map[b] for _, b, _ in comparisons), dtype=np.intp, count=m)
+    scores = np.fromiter((s for _, _, s in comparisons), dtype=np.float64, count=m)
     x0 = np.zeros(n)
     res = minimize(
         _bt_neg_log_likelihood,
         x0,
-        args=(candidates, comparisons, idx_map),
+        args=(idx_a, idx_b, scores),
         method="L-BFGS-B",
         bounds=[(LOG_THETA_MIN, LOG_THETA_MAX)] * n,
     )
@@ -106,6 +305,63 @@ def compute_bt_mm_scipy(
     return {candidates[i]: float(theta[i]) for i in range(n)}
 
 
+def _mm_iterate_vectorized(
+    theta: np.ndarray,
+    wins: np.ndarray,
+    comp_matrix: np.ndarray,
+    max_iter: int,
+    tol: float,
+) -> np.ndarray:
+    """NumPy fallback for the MM loop: one broadcast over the pair matrix
+    per iteration instead of an O(n^2) Python loop."""
+    for _ in range(max_iter):
+        denom = (comp_matrix / (theta[:, None] + theta[None, :])).sum(axis=1)
+        theta_new = np.where(
+            (wins > 0) & (denom > 0),
+            wins / np.where(denom > 0, denom, 1.0),
+            EPSILON,
+        )
+        converged = np.max(np.abs(theta_new - theta)) < tol
+        theta = theta_new
+        if converged:
+            break
+    return theta
+
+
+def _mm_iterate(
+    theta: np.ndarray,
+    wins: np.ndarray,
+    comp_matrix: np.ndarray,
+    max_iter: int,
+    tol: float,
+) -> np.ndarray:
+    n = theta.shape[0]
+    for _ in range(max_iter):
+        theta_old = theta.copy()
+        for i in range(n):
+            if wins[i] == 0:
+                theta[i] = EPSILON
+                continue
+            denom = 0.0
+            for j in range(n):
+                if comp_matrix[i, j] > 0:
+                    denom += comp_matrix[i, j] / (theta_old[i] + theta_old[j])
+            theta[i] = wins[i] / denom if denom > 0 else EPSILON
+        if np.max(np.abs(theta - theta_old)) < tol:
+            break
+    return theta
+
+
+if NUMBA_AVAILABLE:
+    # cache=True amortizes the one-off compile across processes; fastmath lets
+    # LLVM vectorize the inner reduction.
+    _mm_iterate = njit(cache=True, fastmath=True)(_mm_iterate)
+else:
+    # Without numba the explicit loops run in the interpreter; the
+    # broadcast version is orders of magnitude faster there.
+    _mm_iterate = _mm_iterate_vectorized
+
+
 def compute_bt_mm(
     candidates: List[str],
     comparisons: List[Tuple[str, str, float]],
@@ -125,20 +381,7 @@ def compute_bt_mm(
         wins[j] += (1.0 - score)
         comp_matrix[i, j] += 1
         comp_matrix[j, i] += 1
-    for _ in range(max_iter):
-        theta_old = theta.copy()
-        for i in range(n):
-            if wins[i] == 0:
-                theta[i] = EPSILON
-                continue
-            denom = sum(
-                comp_matrix[i, j] / (theta_old[i] + theta_old[j])
-                for j in range(n)
-                if comp_matrix[i, j] > 0
-            )
-            theta[i] = wins[i] / denom if denom > 0 else EPSILON
-        if np.max(np.abs(theta - theta_old)) < tol:
-            break
+    theta = _mm_iterate(theta, wins, comp_matrix, max_iter, tol)
     total = np.sum(theta)
     if total > 0:
         theta = theta / total * SCORE_NORMALIZATION_TARGET
@@ -151,25 +394,86 @@ class BTMMScoringEngine:
         db_path: str,
         convergence_tol: float = 1e-6,
         max_iterations: int = 100,
+        verbose: bool = False,
+        autocommit: bool = True,
+        stats_denormalized: bool = True,
     ):
         self.db_path = Path(db_path)
         self.convergence_tol = convergence_tol
         self.max_iterations = max_iterations
         self.initial_score = DEFAULT_INITIAL_SCORE
+        # autocommit=False defers the per-comparison fsync; callers batch
+        # several record_comparison calls and then flush() once.
+        self.autocommit = autocommit
+        # stats_denormalized=False skips the per-comparison W/L/T counter
+        # writes (halving bytes written per comparison) and serves stats
+        # reads from the candidate_stats view instead. Reads get slower,
+        # writes cheaper — pick per workload.
+        self.stats_denormalized = stats_denormalized
+        self._stats_source = 'bt_scores' if stats_denormalized else 'candidate_stats'
+        # Cold-path logging only (open/close/export). record_comparison and
+        # the score lookups must never log: a single print there costs more
+        # than the whole comparison.
+        self._log = print if verbose else (lambda *args, **kwargs: None)
 
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.conn = self._init_db()
+        # Write-through LRU caches: candidate_id -> bt_score / BTStats.
+        # Every score written to SQLite is mirrored here, so hot-path
+        # lookups are a dict hit instead of a query; capacity-bounded so a
+        # long-running tournament cannot grow them without limit. See
+        # refresh() for external writers.
+        self._score_cache: "OrderedDict[str, float]" = OrderedDict()
+        self._stats_cache: "OrderedDict[str, BTStats]" = OrderedDict()
+        # Pool of read-only connections so WAL readers don't serialize
+        # behind the single write connection. Connections are opened lazily
+        # (the db file exists once _init_db has run) and capped at pool size.
+        self._read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(
+            maxsize=SQLITE_READ_POOL_SIZE
+        )
+        self._log(f"BT-MM scoring engine ready: {self.db_path}")
 
     def _init_db(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self.db_path), timeout=SQLITE_TIMEOUT_SECONDS, check_same_thread=False)
+        is_new_db = not self.db_path.exists() or self.db_path.stat().st_size == 0
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=SQLITE_TIMEOUT_SECONDS,
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE_SIZE,
+        )
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            if is_new_db:
+                # Must run before the first page is written (and before
+                # switching to WAL, which freezes the page size).
+                conn.execute("PRAGMA page_size=8192")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Read-side tuning: memory-map up to 256 MB of the db file, hold a
+            # 64 MB page cache, and keep temp b-trees off disk. Negative
+            # cache_size is in KiB per the sqlite docs.
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            # Bound WAL growth and wait instead of erroring when another process
+            # holds the write lock (e.g. rejudge.py against a live engine).
+            conn.execute("PRAGMA wal_autocheckpoint=1000")
+            conn.execute("PRAGMA busy_timeout=5000")
+        except sqlite3.OperationalError:
+            # Read-only filesystems reject some of these; the defaults are
+            # functional, just slower.
+            pass
         self._create_schema(conn)
         return conn
     
     def _create_schema(self, conn: sqlite3.Connection):
-        conn.executescript("""
+        # win_rate is computed once at write time by sqlite instead of per
+        # row in Python on every rankings query.
+        win_rate_column = (
+            f"win_rate REAL GENERATED ALWAYS AS ({_WIN_RATE_EXPR}) STORED,"
+            if _SQLITE_SUPPORTS_GENERATED else ""
+        )
+        conn.executescript(f"""
             CREATE TABLE IF NOT EXISTS bt_scores (
                 candidate_id TEXT PRIMARY KEY,
                 bt_score REAL NOT NULL,
@@ -177,12 +481,17 @@ class BTMMScoringEngine:
                 wins INTEGER DEFAULT 0,
                 losses INTEGER DEFAULT 0,
                 ties INTEGER DEFAULT 0,
+                {win_rate_column}
                 created_at REAL NOT NULL,
                 updated_at REAL NOT NULL
             );
-            
+
+            -- Clustered on the canonical pair: WITHOUT ROWID makes the table
+            -- itself the pair index, so there is no separate rowid b-tree
+            -- and no duplicate UNIQUE index repeating both TEXT keys.
+            -- Databases created before this keep their old layout; nothing
+            -- references comparisons.id or its rowid.
             CREATE TABLE IF NOT EXISTS comparisons (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
                 candidate_a TEXT NOT NULL,
                 candidate_b TEXT NOT NULL,
                 winner TEXT NOT NULL CHECK(winner IN ('a', 'b', 'tie')),
@@ -192,95 +501,473 @@ class BTMMScoringEngine:
                 score_b_after REAL NOT NULL,
                 judge_reasoning TEXT,
                 timestamp REAL NOT NULL,
-                UNIQUE(candidate_a, candidate_b)
-            );
+                PRIMARY KEY (candidate_a, candidate_b)
+            ) WITHOUT ROWID;
             
             CREATE INDEX IF NOT EXISTS idx_bt_score ON bt_scores(bt_score DESC);
-            CREATE INDEX IF NOT EXISTS idx_candidate_a ON comparisons(candidate_a);
-            CREATE INDEX IF NOT EXISTS idx_candidate_b ON comparisons(candidate_b);
+            -- Pairs are stored in canonical (min, max) order, so the implicit
+            -- UNIQUE(candidate_a, candidate_b) index covers pair lookups and
+            -- history scans on candidate_a; candidate_b gets a composite
+            -- index including timestamp so the history UNION ALL branch is
+            -- satisfied in index order.
+            DROP INDEX IF EXISTS idx_candidate_a;
+            DROP INDEX IF EXISTS idx_candidate_b;
+            CREATE INDEX IF NOT EXISTS idx_candidate_b_ts ON comparisons(candidate_b, timestamp);
+
+            -- Normalized view of the denormalized counters: derives W/L/T
+            -- straight from comparisons (canonical pair order, winner is
+            -- from candidate_a's perspective). Emits columns in
+            -- _BT_SCORE_COLUMNS order so it can substitute for bt_scores
+            -- in read queries when stats_denormalized is off.
+            CREATE VIEW IF NOT EXISTS candidate_stats AS
+            SELECT s.candidate_id,
+                   s.bt_score,
+                   COUNT(c.winner) AS num_comparisons,
+                   COALESCE(SUM(CASE WHEN (c.candidate_a = s.candidate_id AND c.winner = 'a')
+                                       OR (c.candidate_b = s.candidate_id AND c.winner = 'b')
+                                     THEN 1 ELSE 0 END), 0) AS wins,
+                   COALESCE(SUM(CASE WHEN (c.candidate_a = s.candidate_id AND c.winner = 'b')
+                                       OR (c.candidate_b = s.candidate_id AND c.winner = 'a')
+                                     THEN 1 ELSE 0 END), 0) AS losses,
+                   COALESCE(SUM(CASE WHEN c.winner = 'tie' THEN 1 ELSE 0 END), 0) AS ties,
+                   s.created_at,
+                   s.updated_at
+            FROM bt_scores s
+            LEFT JOIN comparisons c
+                ON s.candidate_id = c.candidate_a OR s.candidate_id = c.candidate_b
+            GROUP BY s.candidate_id;
         """)
+
+        conn.commit()
+
+        if _SQLITE_SUPPORTS_GENERATED:
+            # table_xinfo, not table_info: generated columns are hidden from
+            # the latter.
+            columns = {r[1] for r in conn.execute("PRAGMA table_xinfo(bt_scores)")}
+            if 'win_rate' not in columns:
+                # Pre-existing databases: sqlite only allows adding VIRTUAL
+                # generated columns, which read identically to STORED ones.
+                conn.execute(
+                    f"ALTER TABLE bt_scores ADD COLUMN win_rate REAL "
+                    f"GENERATED ALWAYS AS ({_WIN_RATE_EXPR}) VIRTUAL"
+                )
     
+    def _open_read_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            timeout=SQLITE_TIMEOUT_SECONDS,
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        return conn
+
+    @contextmanager
+    def _read_conn(self):
+        """Check a read-only connection out of the pool.
+
+        Falls back to the write connection when a commit is pending
+        (autocommit=False), since read-only connections cannot see
+        uncommitted writes.
+        """
+        if not self.autocommit or self.conn.in_transaction:
+            yield self.conn
+            return
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_read_connection()
+        try:
+            yield conn
+        finally:
+            try:
+                self._read_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _map_partitions(self, fn, num_workers: int = 4) -> List[Any]:
+        """Run fn(conn, worker_index, num_workers) across worker threads.
+
+        Each worker gets a private read-only connection, so large scans
+        (ranking analytics, export chunks) run in parallel — sqlite releases
+        the GIL inside its C code. fn is responsible for selecting its own
+        partition from worker_index/num_workers (e.g. a modulo on a hashed
+        key); the list of per-worker results is returned in worker order
+        for the caller to reduce.
+        """
+        if self.conn.in_transaction:
+            # Readers cannot see uncommitted writes; make them visible.
+            self.conn.commit()
+        conns = [self._open_read_connection() for _ in range(num_workers)]
+        try:
+            with ThreadPoolExecutor(max_workers=num_workers) as pool:
+                futures = [
+                    pool.submit(fn, conns[i], i, num_workers)
+                    for i in range(num_workers)
+                ]
+                return [future.result() for future in futures]
+        finally:
+            for conn in conns:
+                conn.close()
+
     def get_score(self, candidate_id: str) -> float:
-        row = self.conn.execute(
-            "SELECT bt_score FROM bt_scores WHERE candidate_id = ?", 
-            (candidate_id,)
-        ).fetchone()
-        
-        if row:
-            return float(row['bt_score'])
-        
+        score = self._get_or_create_score(candidate_id, time.time())
+        self._maybe_commit()
+        return score
+
+    def get_scores(self, candidate_ids: List[str]) -> Dict[str, float]:
+        """Fetch several candidates' scores in one round trip.
+
+        Unknown candidates are bootstrapped at the initial score, mirroring
+        get_score; cached entries never touch SQLite at all.
+        """
+        result: Dict[str, float] = {}
+        missing = []
+        for cid in candidate_ids:
+            cached = self._cached_score(cid)
+            if cached is not None:
+                result[cid] = cached
+            else:
+                missing.append(cid)
+        if not missing:
+            return result
+
         now = time.time()
-        self.conn.execute(
-            "INSERT INTO bt_scores (candidate_id, bt_score, created_at, updated_at) VALUES (?, ?, ?, ?)",
-            (candidate_id, self.initial_score, now, now)
-        )
+        placeholders = ','.join('?' * len(missing))
+        rows = self.conn.execute(
+            f"SELECT candidate_id, bt_score FROM bt_scores WHERE candidate_id IN ({placeholders})",
+            tuple(missing)
+        ).fetchall()
+        for row in rows:
+            result[row['candidate_id']] = float(row['bt_score'])
+
+        to_create = [cid for cid in missing if cid not in result]
+        if to_create:
+            self.conn.executemany(
+                _SQL_INSERT_CANDIDATE_IGNORE,
+                [(cid, self.initial_score, now, now) for cid in to_create]
+            )
+            for cid in to_create:
+                result[cid] = self.initial_score
+
+        for cid in missing:
+            self._cache_score(cid, result[cid])
+        self._maybe_commit()
+        return result
+
+    def flush(self):
+        """Commit any writes deferred by autocommit=False."""
         self.conn.commit()
-        return self.initial_score
+
+    def _maybe_commit(self):
+        if self.autocommit:
+            self.conn.commit()
+
+    def _get_or_create_score(self, candidate_id: str, now: float) -> float:
+        cached = self._cached_score(candidate_id)
+        if cached is not None:
+            return cached
+
+        if _SQLITE_SUPPORTS_RETURNING:
+            row = self.conn.execute(
+                _SQL_UPSERT_CANDIDATE_RETURNING,
+                (candidate_id, self.initial_score, now, now)
+            ).fetchone()
+            score = float(row[0])
+        else:
+            row = self.conn.execute(_SQL_SELECT_SCORE, (candidate_id,)).fetchone()
+            if row:
+                score = float(row['bt_score'])
+            else:
+                self.conn.execute(_SQL_INSERT_CANDIDATE, (candidate_id, self.initial_score, now, now))
+                score = self.initial_score
+
+        self._cache_score(candidate_id, score)
+        return score
+
+    def refresh(self):
+        """Drop the in-memory caches.
+
+        Call after another process (e.g. rejudge.py) has written to the
+        database so subsequent lookups re-read from SQLite.
+        """
+        self._score_cache.clear()
+        self._stats_cache.clear()
+
+    def _cached_score(self, candidate_id: str) -> Optional[float]:
+        score = self._score_cache.get(candidate_id)
+        if score is not None:
+            self._score_cache.move_to_end(candidate_id)
+        return score
+
+    def _cache_score(self, candidate_id: str, score: float):
+        self._score_cache[candidate_id] = score
+        self._score_cache.move_to_end(candidate_id)
+        if len(self._score_cache) > SCORE_CACHE_CAPACITY:
+            self._score_cache.popitem(last=False)
     
     def get_stats(self, candidate_id: str) -> Optional[BTStats]:
-        row = self.conn.execute(
-            "SELECT * FROM bt_scores WHERE candidate_id = ?", 
-            (candidate_id,)
-        ).fetchone()
-        return BTStats(**dict(row)) if row else None
+        stats = self._stats_cache.get(candidate_id)
+        if stats is not None:
+            self._stats_cache.move_to_end(candidate_id)
+            return stats
+
+        with self._read_conn() as conn:
+            row = conn.execute(
+                f"SELECT {_BT_SCORE_COLUMNS} FROM {self._stats_source} WHERE candidate_id = ?",
+                (candidate_id,)
+            ).fetchone()
+        if not row:
+            return None
+
+        stats = BTStats(*row)
+        self._stats_cache[candidate_id] = stats
+        if len(self._stats_cache) > SCORE_CACHE_CAPACITY:
+            self._stats_cache.popitem(last=False)
+        return stats
     
-    def record_comparison(self, candidate_a: str, candidate_b: str, winner: str, reasoning: str = "") -> Tuple[float, float]:
+    def record_comparison(self, candidate_a: str, candidate_b: str, winner: str,
+                          reasoning: str = "", check_duplicate: bool = True) -> Tuple[float, float]:
+        """Record one comparison and refit scores.
+
+        Deduplication is insert-first: the UNIQUE pair constraint arbitrates
+        via INSERT OR IGNORE, so two writers can never double-count. The
+        check_duplicate probe is just a cheap early exit for duplicate-heavy
+        callers; pass False when pairs are known to be fresh.
+        """
         if winner not in ('a', 'b', 'tie'):
             raise ValueError(f"Invalid winner: {winner}")
-        
-        if self._comparison_exists(candidate_a, candidate_b):
-            return self.get_score(candidate_a), self.get_score(candidate_b)
-        
-        score_a_old, score_b_old = self.get_score(candidate_a), self.get_score(candidate_b)
-        
-        self._update_candidate(candidate_a, winner, 'a')
-        self._update_candidate(candidate_b, winner, 'b')
-        
-        self._store_comparison(candidate_a, candidate_b, winner, score_a_old, score_b_old, 
-                            score_a_old, score_b_old, reasoning)
-        
+
+        candidate_a, candidate_b, winner, swapped = _canonical_pair(candidate_a, candidate_b, winner)
+
+        if check_duplicate and self._comparison_exists(candidate_a, candidate_b):
+            score_a, score_b = self.get_score(candidate_a), self.get_score(candidate_b)
+            return (score_b, score_a) if swapped else (score_a, score_b)
+
+        now = time.time()
+
+        # A savepoint is only needed when a transaction is already open
+        # (deferred commits): rolling back then must not discard unrelated
+        # writes. Otherwise a plain rollback covers exactly this comparison
+        # and saves two statements per call.
+        use_savepoint = self.conn.in_transaction
+        if use_savepoint:
+            self.conn.execute("SAVEPOINT record_comparison")
+
+        score_a_old = self._upsert_candidate(candidate_a, winner, 'a', now)
+        score_b_old = self._upsert_candidate(candidate_b, winner, 'b', now)
+
+        inserted = self._store_comparison(candidate_a, candidate_b, winner, score_a_old, score_b_old,
+                            score_a_old, score_b_old, reasoning, now,
+                            or_ignore=True)
+        if not inserted:
+            # Another writer got the pair in first: undo the W/L/T bumps and
+            # report the scores already on record.
+            if use_savepoint:
+                self.conn.execute("ROLLBACK TO record_comparison")
+                self.conn.execute("RELEASE record_comparison")
+            else:
+                self.conn.rollback()
+            # The upserts above were rolled back; drop anything they cached.
+            for cid in (candidate_a, candidate_b):
+                self._score_cache.pop(cid, None)
+                self._stats_cache.pop(cid, None)
+            score_a, score_b = self.get_score(candidate_a), self.get_score(candidate_b)
+            return (score_b, score_a) if swapped else (score_a, score_b)
+        if use_savepoint:
+            self.conn.execute("RELEASE record_comparison")
+
+
         new_scores = self._recompute_all_scores()
         score_a_new = new_scores.get(candidate_a, score_a_old)
         score_b_new = new_scores.get(candidate_b, score_b_old)
         
         self.conn.execute(
-            """UPDATE comparisons 
-            SET score_a_after = ?, score_b_after = ?
-            WHERE candidate_a = ? AND candidate_b = ?""",
+            _SQL_UPDATE_COMPARISON_AFTER,
             (score_a_new, score_b_new, candidate_a, candidate_b)
         )
-        
+
+        self._maybe_commit()
+        return (score_b_new, score_a_new) if swapped else (score_a_new, score_b_new)
+
+    def record_comparisons_bulk(self, comparisons: List[Tuple]) -> Dict[str, float]:
+        """Record many comparisons in a single transaction.
+
+        Each entry is (candidate_a, candidate_b, winner) or
+        (candidate_a, candidate_b, winner, reasoning). Scores are refit once
+        at the end instead of after every comparison, and a single commit
+        amortizes the fsync across the whole batch.
+        """
+        normalized = []
+        for entry in comparisons:
+            a, b, winner = entry[0], entry[1], entry[2]
+            reasoning = entry[3] if len(entry) > 3 else ""
+            if winner not in ('a', 'b', 'tie'):
+                raise ValueError(f"Invalid winner: {winner}")
+            a, b, winner, _ = _canonical_pair(a, b, winner)
+            normalized.append((a, b, winner, reasoning))
+
+        now = time.time()
+        recorded = []
+        seen_pairs = set()
+        old_scores: Dict[str, float] = {}
+        update_rows = []
+        insert_rows = []
+        for a, b, winner, reasoning in normalized:
+            if (a, b) in seen_pairs or self._comparison_exists(a, b):
+                continue
+            seen_pairs.add((a, b))
+            score_a_old = old_scores.setdefault(a, self._get_or_create_score(a, now))
+            score_b_old = old_scores.setdefault(b, self._get_or_create_score(b, now))
+
+            # b's triple is a's with wins/losses mirrored; one lookup serves both.
+            wins_a, losses_a, ties = _WLT_INCR[(winner, 'a')]
+            update_rows.append((wins_a, losses_a, ties, now, a))
+            update_rows.append((losses_a, wins_a, ties, now, b))
+            insert_rows.append((a, b, winner, score_a_old, score_b_old,
+                                score_a_old, score_b_old, reasoning, now))
+            recorded.append((a, b))
+
+        if not recorded:
+            self.conn.commit()
+            return {}
+
+        cur = self.conn.cursor()
+        if self.stats_denormalized:
+            cur.executemany(_SQL_UPDATE_CANDIDATE, update_rows)
+        cur.executemany(_SQL_INSERT_COMPARISON, insert_rows)
+
+        new_scores = self._recompute_all_scores()
+        cur.executemany(
+            _SQL_UPDATE_COMPARISON_AFTER,
+            [
+                (new_scores.get(a, old_scores[a]), new_scores.get(b, old_scores[b]), a, b)
+                for a, b in recorded
+            ]
+        )
+
         self.conn.commit()
-        return score_a_new, score_b_new
-    
+        return new_scores
+
+    def _win_rate_sql(self) -> str:
+        # The generated column only exists on the bt_scores table; the view
+        # (and pre-3.31 sqlite) computes the expression inline.
+        if _SQLITE_SUPPORTS_GENERATED and self.stats_denormalized:
+            return "win_rate"
+        return f"({_WIN_RATE_EXPR})"
+
+    def recompute_scores(self) -> Dict[str, float]:
+        """Refit every candidate from the stored comparisons and persist.
+
+        Lets external writers (rejudge.py editing the comparisons table)
+        trigger one vectorized refit instead of replaying comparisons
+        through record_comparison one at a time.
+        """
+        new_scores = self._recompute_all_scores()
+        self._maybe_commit()
+        return new_scores
+
     def get_rankings(self, top_n: Optional[int] = None, min_comparisons: int = 0) -> List[Tuple[str, float, Dict[str, Any]]]:
+        win_rate = self._win_rate_sql()
         query = f"""
-            SELECT candidate_id, bt_score, num_comparisons, wins, losses, ties
-            FROM bt_scores WHERE num_comparisons >= ?
+            SELECT candidate_id, bt_score, num_comparisons, wins, losses, ties, {win_rate}
+            FROM {self._stats_source} WHERE num_comparisons >= ?
             ORDER BY bt_score DESC
             {f'LIMIT {top_n}' if top_n else ''}
         """
+        with self._read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            rows = cur.execute(query, (min_comparisons,)).fetchall()
         return [
-            (r['candidate_id'], r['bt_score'], {
-                'comparisons': r['num_comparisons'],
-                'wins': r['wins'],
-                'losses': r['losses'],
-                'ties': r['ties'],
-                'win_rate': (r['wins'] + 0.5 * r['ties']) / max(r['num_comparisons'], 1)
+            (cid, score, {
+                'comparisons': nc,
+                'wins': w,
+                'losses': l,
+                'ties': t,
+                'win_rate': wr
             })
-            for r in self.conn.execute(query, (min_comparisons,)).fetchall()
+            for cid, score, nc, w, l, t, wr in rows
         ]
     
+    def get_rankings_arrays(self, min_comparisons: int = 0) -> Dict[str, np.ndarray]:
+        """Columnar variant of get_rankings for vectorized analytics.
+
+        Returns parallel NumPy arrays keyed by column instead of one
+        tuple+dict per row, so downstream aggregation stays out of the
+        interpreter.
+        """
+        win_rate = self._win_rate_sql()
+        with self._read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            rows = cur.execute(
+                f"""
+                SELECT candidate_id, bt_score, num_comparisons, wins, losses, ties, {win_rate}
+                FROM {self._stats_source} WHERE num_comparisons >= ?
+                ORDER BY bt_score DESC
+                """,
+                (min_comparisons,)
+            ).fetchall()
+
+        columns = zip(*rows) if rows else ([],) * 7
+        dtypes = (object, np.float64, np.int64, np.int64, np.int64, np.int64, np.float64)
+        names = ('candidate_id', 'bt_score', 'num_comparisons', 'wins', 'losses', 'ties', 'win_rate')
+        return {
+            name: np.array(col, dtype=dtype)
+            for name, col, dtype in zip(names, columns, dtypes)
+        }
+
     def get_random_candidates(self, n: int, exclude: Optional[List[str]] = None) -> List[str]:
-        if exclude:
-            placeholders = ','.join('?' * len(exclude))
-            query = f"SELECT candidate_id FROM bt_scores WHERE candidate_id NOT IN ({placeholders}) ORDER BY RANDOM() LIMIT ?"
-            params = tuple(exclude) + (n,)
-        else:
-            query = "SELECT candidate_id FROM bt_scores ORDER BY RANDOM() LIMIT ?"
-            params = (n,)
-        
-        return [r['candidate_id'] for r in self.conn.execute(query, params).fetchall()]
+        with self._read_conn() as conn:
+            return self._sample_random_candidates(conn, n, exclude)
+
+    def _sample_random_candidates(
+        self, conn: sqlite3.Connection, n: int, exclude: Optional[List[str]]
+    ) -> List[str]:
+        max_rowid = conn.execute("SELECT MAX(rowid) FROM bt_scores").fetchone()[0]
+        if not max_rowid or n <= 0:
+            return []
+
+        # Sample random rowids instead of ORDER BY RANDOM(), which scans and
+        # sorts the whole table. Oversample to absorb excluded hits and retry
+        # a few times before falling back to the exhaustive query; tiny
+        # tables skip straight to the fallback scan.
+        seen = set(exclude) if exclude else set()
+        result: List[str] = []
+        for _ in range(4 if max_rowid >= RANDOM_SAMPLE_MIN_ROWS else 0):
+            if len(result) >= n:
+                break
+            k = min(max_rowid, 2 * (n - len(result)) + 4)
+            rowids = random.sample(range(1, max_rowid + 1), k)
+            placeholders = ','.join('?' * len(rowids))
+            rows = conn.execute(
+                f"SELECT candidate_id FROM bt_scores WHERE rowid IN ({placeholders})",
+                tuple(rowids)
+            ).fetchall()
+            for r in rows:
+                if r['candidate_id'] not in seen:
+                    seen.add(r['candidate_id'])
+                    result.append(r['candidate_id'])
+                    if len(result) == n:
+                        break
+
+        if len(result) < n:
+            if seen:
+                placeholders = ','.join('?' * len(seen))
+                query = f"SELECT candidate_id FROM bt_scores WHERE candidate_id NOT IN ({placeholders}) ORDER BY RANDOM() LIMIT ?"
+                params = tuple(seen) + (n - len(result),)
+            else:
+                query = "SELECT candidate_id FROM bt_scores ORDER BY RANDOM() LIMIT ?"
+                params = (n - len(result),)
+            rows = conn.execute(query, params).fetchall()
+            result.extend(r['candidate_id'] for r in rows)
+
+        return result
 
     def get_quartile_candidates(
         self, n_quartiles: int = 4, exclude: Optional[List[str]] = None
@@ -319,34 +1006,66 @@ class BTMMScoringEngine:
                 break
         return neighbors[:n]
 
-    def get_comparison_history(self, candidate_id: str) -> List[ComparisonResult]:
-        rows = self.conn.execute(
-            "SELECT * FROM comparisons WHERE candidate_a = ? OR candidate_b = ? ORDER BY timestamp DESC",
-            (candidate_id, candidate_id)
-        ).fetchall()
-        
-        return [self._row_to_comparison(row) for row in rows]
+    def get_comparison_history(
+        self, candidate_id: str, limit: Optional[int] = None, offset: int = 0
+    ) -> List[ComparisonResult]:
+        query, params = _SQL_HISTORY, (candidate_id, candidate_id)
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += (limit, offset)
+
+        with self._read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            rows = cur.execute(query, params).fetchall()
+
+        return [ComparisonResult(*row) for row in rows]
+
+    def iter_comparison_history(
+        self, candidate_id: str, limit: Optional[int] = None, offset: int = 0,
+        as_dict: bool = False
+    ):
+        """Yield a candidate's comparisons newest-first, one at a time.
+
+        Streaming variant of get_comparison_history for popular candidates
+        with long histories; as_dict=True yields export-shaped dicts and
+        skips the dataclass construction.
+        """
+        query, params = _SQL_HISTORY, (candidate_id, candidate_id)
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += (limit, offset)
+
+        with self._read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            for row in cur.execute(query, params):
+                yield _comparison_row_to_dict(row, True) if as_dict else ComparisonResult(*row)
     
     def comparison_exists(self, candidate_a: str, candidate_b: str) -> bool:
         return self._comparison_exists(candidate_a, candidate_b)
     
     def get_comparison(self, candidate_a: str, candidate_b: str) -> Optional[ComparisonResult]:
-        row = self.conn.execute(
-            """SELECT * FROM comparisons 
-               WHERE (candidate_a = ? AND candidate_b = ?) OR (candidate_a = ? AND candidate_b = ?)""",
-            (candidate_a, candidate_b, candidate_b, candidate_a)
-        ).fetchone()
+        if candidate_b < candidate_a:
+            candidate_a, candidate_b = candidate_b, candidate_a
+        with self._read_conn() as conn:
+            row = conn.execute(_SQL_SELECT_PAIR, (candidate_a, candidate_b)).fetchone()
         return self._row_to_comparison(row) if row else None
     
-    def export_data(self) -> Dict[str, Any]:
-        scores = [
-            BTStats(**dict(r)).to_dict() 
-            for r in self.conn.execute("SELECT * FROM bt_scores ORDER BY bt_score DESC").fetchall()
-        ]
-        comparisons = [
-            self._row_to_comparison(r).to_dict() 
-            for r in self.conn.execute("SELECT * FROM comparisons ORDER BY timestamp DESC").fetchall()
-        ]
+    def export_data(self, iso_dates: bool = True) -> Dict[str, Any]:
+        with self._read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            scores = [
+                _score_row_to_dict(row, iso_dates)
+                for row in cur.execute(
+                    f"SELECT {_BT_SCORE_COLUMNS} FROM {self._stats_source} ORDER BY bt_score DESC"
+                )
+            ]
+            comparisons = [
+                _comparison_row_to_dict(row, iso_dates)
+                for row in cur.execute(f"SELECT {_COMPARISON_COLUMNS} FROM comparisons ORDER BY timestamp DESC")
+            ]
         
         return {
             'metadata': {
@@ -361,6 +1080,56 @@ class BTMMScoringEngine:
             'comparisons': comparisons,
         }
     
+    def export_to_json(self, path: str):
+        """Stream the full export straight to a JSON file.
+
+        Unlike json.dump(engine.export_data(), ...), this never holds more
+        than one row's worth of Python objects.
+        """
+        with open(path, 'w', encoding='utf-8') as fp:
+            self.export_data_stream(fp)
+
+    def export_data_stream(self, fp, iso_dates: bool = True):
+        """Write the export_data() document as JSON to a text file object.
+
+        Rows are converted and written one at a time straight off the
+        cursor, so peak memory stays flat regardless of database size.
+        """
+        with self._read_conn() as conn:
+            total_candidates = conn.execute("SELECT COUNT(*) FROM bt_scores").fetchone()[0]
+            total_comparisons = conn.execute("SELECT COUNT(*) FROM comparisons").fetchone()[0]
+            metadata = {
+                'algorithm': 'Bradley-Terry-MM',
+                'convergence_tol': self.convergence_tol,
+                'max_iterations': self.max_iterations,
+                'total_candidates': total_candidates,
+                'total_comparisons': total_comparisons,
+                'export_timestamp': datetime.now().isoformat(),
+            }
+
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.arraysize = 1024
+
+            fp.write('{"metadata": ')
+            fp.write(json.dumps(metadata))
+
+            fp.write(', "scores": [')
+            for i, row in enumerate(cur.execute(
+                f"SELECT {_BT_SCORE_COLUMNS} FROM {self._stats_source} ORDER BY bt_score DESC"
+            )):
+                if i:
+                    fp.write(', ')
+                fp.write(json.dumps(_score_row_to_dict(row, iso_dates)))
+
+            fp.write('], "comparisons": [')
+            for i, row in enumerate(cur.execute(f"SELECT {_COMPARISON_COLUMNS} FROM comparisons ORDER BY timestamp DESC")):
+                if i:
+                    fp.write(', ')
+                fp.write(json.dumps(_comparison_row_to_dict(row, iso_dates)))
+
+            fp.write(']}')
+
     def print_rankings(self, top_n: int = 10):
         print(f"\n{'='*70}\nBT-MM RANKINGS (Top {top_n})\n{'='*70}")
         print(f"{'Rank':<6} {'Candidate':<25} {'Score':<8} {'W-L-T':<12} {'WinRate':<8}\n{'-'*70}")
@@ -371,30 +1140,48 @@ class BTMMScoringEngine:
         print(f"{'='*70}\n")
     
     def _comparison_exists(self, candidate_a: str, candidate_b: str) -> bool:
-        return self.conn.execute(
-            "SELECT 1 FROM comparisons WHERE (candidate_a = ? AND candidate_b = ?) OR (candidate_a = ? AND candidate_b = ?)",
-            (candidate_a, candidate_b, candidate_b, candidate_a)
-        ).fetchone() is not None
+        if candidate_b < candidate_a:
+            candidate_a, candidate_b = candidate_b, candidate_a
+        return self.conn.execute(_SQL_PAIR_EXISTS, (candidate_a, candidate_b)).fetchone() is not None
     
-    def _update_candidate(self, candidate_id: str, winner: str, perspective: str):
-        is_win = winner == perspective
-        is_loss = winner != perspective and winner != 'tie'
-        is_tie = winner == 'tie'
-        
+    def _upsert_candidate(self, candidate_id: str, winner: str, perspective: str, now: float) -> float:
+        """Create-or-bump a candidate's stats row; returns its current score.
+
+        One B-tree traversal replaces the get-or-create plus UPDATE pair
+        when RETURNING is available.
+        """
+        if not self.stats_denormalized:
+            # Counters are derived from comparisons via the candidate_stats
+            # view; only the score row itself needs to exist.
+            return self._get_or_create_score(candidate_id, now)
+        if _SQLITE_SUPPORTS_RETURNING:
+            wins, losses, ties = _WLT_INCR[(winner, perspective)]
+            row = self.conn.execute(
+                _SQL_UPSERT_CANDIDATE_STATS,
+                (candidate_id, self.initial_score, wins, losses, ties, now, now)
+            ).fetchone()
+            score = float(row[0])
+            self._cache_score(candidate_id, score)
+            self._stats_cache.pop(candidate_id, None)
+            return score
+
+        score = self._get_or_create_score(candidate_id, now)
+        self._update_candidate(candidate_id, winner, perspective, now)
+        self._stats_cache.pop(candidate_id, None)
+        return score
+
+    def _update_candidate(self, candidate_id: str, winner: str, perspective: str, now: float):
+        wins, losses, ties = _WLT_INCR[(winner, perspective)]
         self.conn.execute(
-            """UPDATE bt_scores 
-               SET num_comparisons = num_comparisons + 1,
-                   wins = wins + ?, losses = losses + ?, ties = ties + ?, updated_at = ?
-               WHERE candidate_id = ?""",
-            (int(is_win), int(is_loss), int(is_tie), time.time(), candidate_id)
+            _SQL_UPDATE_CANDIDATE,
+            (wins, losses, ties, now, candidate_id)
         )
     
     def _recompute_all_scores(self) -> Dict[str, float]:
-        candidates = [r['candidate_id'] for r in self.conn.execute("SELECT candidate_id FROM bt_scores").fetchall()]
+        candidates = [r['candidate_id'] for r in self.conn.execute(_SQL_SELECT_CANDIDATE_IDS).fetchall()]
         comparisons = []
-        for r in self.conn.execute("SELECT candidate_a, candidate_b, winner FROM comparisons").fetchall():
-            score = {'a': 1.0, 'tie': 0.5, 'b': 0.0}[r['winner']]
-            comparisons.append((r['candidate_a'], r['candidate_b'], score))
+        for r in self.conn.execute(_SQL_SELECT_OUTCOMES).fetchall():
+            comparisons.append((r['candidate_a'], r['candidate_b'], _SCORE_MAP[r['winner']]))
         
         if not comparisons:
             return {c: self.initial_score for c in candidates}
@@ -407,23 +1194,29 @@ class BTMMScoringEngine:
         if not new_scores:
             return {c: self.get_score(c) for c in candidates}
 
-        for candidate_id, score in new_scores.items():
-            self.conn.execute(
-                "UPDATE bt_scores SET bt_score = ?, updated_at = ? WHERE candidate_id = ?",
-                (score, time.time(), candidate_id)
-            )
-        
+        now = time.time()
+        self.conn.executemany(
+            _SQL_UPDATE_SCORE,
+            [(score, now, candidate_id) for candidate_id, score in new_scores.items()]
+        )
+        self._score_cache.update(new_scores)
+        while len(self._score_cache) > SCORE_CACHE_CAPACITY:
+            self._score_cache.popitem(last=False)
+        # The refit moves every candidate's bt_score, so cached stats are
+        # all stale.
+        self._stats_cache.clear()
+
         return new_scores
-    
-    def _store_comparison(self, a: str, b: str, winner: str, score_a_old: float, score_b_old: float, 
-                         score_a_new: float, score_b_new: float, reasoning: str):
-        self.conn.execute(
-            """INSERT INTO comparisons
-               (candidate_a, candidate_b, winner, score_a_before, score_b_before, 
-                score_a_after, score_b_after, judge_reasoning, timestamp)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (a, b, winner, score_a_old, score_b_old, score_a_new, score_b_new, reasoning, time.time())
+
+    def _store_comparison(self, a: str, b: str, winner: str, score_a_old: float, score_b_old: float,
+                         score_a_new: float, score_b_new: float, reasoning: str, now: float,
+                         or_ignore: bool = False) -> bool:
+        sql = _SQL_INSERT_COMPARISON_IGNORE if or_ignore else _SQL_INSERT_COMPARISON
+        cur = self.conn.execute(
+            sql,
+            (a, b, winner, score_a_old, score_b_old, score_a_new, score_b_new, reasoning, now)
         )
+        return cur.rowcount > 0
     
     def _row_to_comparison(self, row) -> ComparisonResult:
         return ComparisonResult(
@@ -439,7 +1232,13 @@ class BTMMScoringEngine:
         )
     
     def close(self):
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
         self.conn.close()
+        self._log(f"BT-MM scoring engine closed: {self.db_path}")
     
     def __enter__(self):
         return self
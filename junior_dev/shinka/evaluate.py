@@ -147,7 +147,20 @@ def _load_json_program(program_path: Path, candidate_id: str) -> Tuple[str, str,
     return evolved_prompt, candidate_id, parent_branch
 
 
+# Cache of exec'd python programs keyed by (path, mtime): batch evaluation
+# loops re-load the same program file many times, and exec_module both costs
+# time and re-runs any module-level side effects.
+_PROGRAM_CACHE: Dict[Tuple[str, float], Tuple[str, str, Optional[str]]] = {}
+
+
 def _load_python_program(program_path: str, candidate_id: str) -> Tuple[str, str, Optional[str]]:
+    try:
+        cache_key = (str(program_path), os.path.getmtime(program_path))
+    except OSError:
+        cache_key = None
+    if cache_key is not None and cache_key in _PROGRAM_CACHE:
+        return _PROGRAM_CACHE[cache_key]
+
     spec = importlib.util.spec_from_file_location("program", program_path)
     if spec is None or spec.loader is None:
         raise ValueError(f"Could not load program from {program_path}")
@@ -160,7 +173,10 @@ def _load_python_program(program_path: str, candidate_id: str) -> Tuple[str, str
     if hasattr(module, "CANDIDATE_ID"):
         candidate_id = module.CANDIDATE_ID
 
-    return evolved_prompt, candidate_id, parent_branch
+    result = (evolved_prompt, candidate_id, parent_branch)
+    if cache_key is not None:
+        _PROGRAM_CACHE[cache_key] = result
+    return result
 
 
 def load_program(program_path: str) -> Tuple[str, str, Optional[str]]:
@@ -274,9 +290,12 @@ def _ensure_target_codebase(
     if not index_html.exists():
         index_html.write_text(SCAFFOLD_HTML)
 
-    subprocess.run(["git", "init"], cwd=path, check=True)
-    subprocess.run(["git", "add", "."], cwd=path, check=True)
-    subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=path, check=True)
+    # One fork instead of three: each git subprocess costs ~30-80ms of
+    # fork/exec/startup, and this sequence always runs together.
+    subprocess.run(
+        ["bash", "-c", "git init && git add . && git commit -m 'Initial commit'"],
+        cwd=path, check=True, capture_output=True, text=True,
+    )
     if verbose:
         print(f"Initialized new git repo: {path}")
 
@@ -520,8 +539,7 @@ def evaluate_coding_agent_prompt(
 
         changes_applied = agent_result.changes_made
         if changes_applied:
-            git_manager.stage_all()
-            git_manager.commit(f"Evolution: {candidate_id}", allow_empty=False)
+            git_manager.stage_and_commit(f"Evolution: {candidate_id}")
 
         # ── Step 3: Pairwise comparisons ────────────────────────
         engine = BTMMScoringEngine(db_path=settings["bt_db_path"])
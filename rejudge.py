@@ -36,9 +36,9 @@ Usage:
 
 import argparse
 import json
+import re
 import shutil
 import sqlite3
-import subprocess
 import sys
 import time
 from pathlib import Path
@@ -50,8 +50,10 @@ load_dotenv()
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from junior_dev.git_manager import GitManager
 from junior_dev.judge import PairwiseJudge
 from junior_dev.scoring import BTMMScoringEngine, compute_bt_mm_scipy
+from junior_dev.shinka.evaluate import truncate_diff
 
 # ── Defaults ─────────────────────────────────────────────────────────
 
@@ -61,42 +63,15 @@ DEFAULT_BASE_BRANCH = "development"
 BRANCH_PREFIX = "candidate_"
 DEFAULT_TASK_SPEC = "Refactor and improve the code quality"
 DEFAULT_JUDGE_MODEL = "deepseek-reasoner"
-MAX_DIFF_CHARS = 200_000
-
-
-def truncate_diff(diff: str, max_chars: int = MAX_DIFF_CHARS) -> str:
-    if len(diff) <= max_chars:
-        return diff
-    keep_each = max_chars // 2
-    removed = len(diff) - max_chars
-    return (
-        diff[:keep_each]
-        + f"\n\n... [TRUNCATED {removed:,} characters] ...\n\n"
-        + diff[-keep_each:]
-    )
-
 
-def get_diff(code_dir: str, base_branch: str, candidate_branch: str) -> str:
-    result = subprocess.run(
-        ["git", "diff", f"{base_branch}..{candidate_branch}"],
-        cwd=code_dir, capture_output=True, text=True,
-    )
-    return result.stdout
-
-
-def branch_exists(code_dir: str, branch_name: str) -> bool:
-    result = subprocess.run(
-        ["git", "branch", "--list", branch_name],
-        cwd=code_dir, capture_output=True, text=True,
-    )
-    return bool(result.stdout.strip())
+_RE_GEN_MAIN = re.compile(r"gen_(\d+)_main")
 
 
 def load_existing_pairs(db_path: str) -> List[Tuple[str, str]]:
     """Load all (candidate_a, candidate_b) pairs from the original DB."""
     conn = sqlite3.connect(db_path)
     rows = conn.execute(
-        "SELECT candidate_a, candidate_b FROM comparisons ORDER BY id"
+        "SELECT candidate_a, candidate_b FROM comparisons ORDER BY timestamp"
     ).fetchall()
     conn.close()
     return [(r[0], r[1]) for r in rows]
@@ -121,8 +96,6 @@ def sync_bt_to_evolution_db(
     (same logic as _sync_bt_scores_to_shinka_db in evaluate.py).
     Falls back to generation-number matching for candidates like gen_N_main.
     """
-    import re
-
     run_path = Path(run_dir).resolve()
     evo_db = run_path / "evolution_db.sqlite"
     if not evo_db.exists():
@@ -176,7 +149,7 @@ def sync_bt_to_evolution_db(
     # Strategy 2: fallback for any unmatched — match gen_N_main to generation N
     if updated < len(score_by_candidate):
         for candidate_id, score in score_by_candidate.items():
-            m = re.match(r"gen_(\d+)_main", candidate_id)
+            m = _RE_GEN_MAIN.match(candidate_id)
             if not m:
                 continue
             gen = int(m.group(1))
@@ -216,6 +189,7 @@ def rejudge(
 
     pairs = load_existing_pairs(orig_db)
     candidates = load_existing_candidates(orig_db)
+    git_manager = GitManager(str(code_path))
 
     print(f"Original DB: {orig_db}")
     print(f"  {len(candidates)} candidates, {len(pairs)} pairs")
@@ -230,8 +204,8 @@ def rejudge(
         for i, (a, b) in enumerate(pairs):
             branch_a = f"{BRANCH_PREFIX}{a}"
             branch_b = f"{BRANCH_PREFIX}{b}"
-            exists_a = branch_exists(str(code_path), branch_a)
-            exists_b = branch_exists(str(code_path), branch_b)
+            exists_a = git_manager.branch_exists(branch_a)
+            exists_b = git_manager.branch_exists(branch_b)
             status = "OK" if (exists_a and exists_b) else f"MISSING({'A' if not exists_a else ''}{'B' if not exists_b else ''})"
             print(f"  [{i+1:3d}] {a} vs {b}  [{status}]")
         return
@@ -281,18 +255,18 @@ def rejudge(
         branch_b = f"{BRANCH_PREFIX}{cand_b}"
 
         # Check branches exist
-        if not branch_exists(str(code_path), branch_a):
+        if not git_manager.branch_exists(branch_a):
             print(f"  [{i+1}/{len(pairs)}] SKIP {cand_a} vs {cand_b}: branch {branch_a} missing")
             skipped += 1
             continue
-        if not branch_exists(str(code_path), branch_b):
+        if not git_manager.branch_exists(branch_b):
             print(f"  [{i+1}/{len(pairs)}] SKIP {cand_a} vs {cand_b}: branch {branch_b} missing")
             skipped += 1
             continue
 
         # Get diffs
-        diff_a = truncate_diff(get_diff(str(code_path), base_branch, branch_a))
-        diff_b = truncate_diff(get_diff(str(code_path), base_branch, branch_b))
+        diff_a = truncate_diff(git_manager.get_diff(base_branch, branch_a))
+        diff_b = truncate_diff(git_manager.get_diff(base_branch, branch_b))
 
         context = {
             "evolution_objective": task_spec,
@@ -28,6 +28,10 @@ setup(
             "anthropic>=0.18.0",
             "openai>=1.0.0",
         ],
+        "fast": [
+            "numba>=0.57.0",
+            "pygit2>=1.12.0",
+        ],
     },
     classifiers=[
         "Development Status :: 4 - Beta",
@@ -275,6 +275,40 @@ def test_export_import():
     print("✓ Export test passed\n")
 
 
+def test_bulk_recording():
+    print("\n" + "="*70)
+    print("TEST: Bulk Comparison Recording")
+    print("="*70)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "test.db"
+        engine = BTMMScoringEngine(db_path=str(db_path))
+
+        print("\nRecording 4 comparisons in one transaction...")
+        scores = engine.record_comparisons_bulk([
+            ("a", "b", "a", "A beats B"),
+            ("a", "c", "a", "A beats C"),
+            ("b", "c", "tie"),
+            ("a", "b", "b", "duplicate, should be skipped"),
+        ])
+
+        assert scores["a"] > scores["b"], "Winner should rank higher"
+        assert scores["a"] > scores["c"]
+
+        stats = engine.get_stats("a")
+        assert stats.num_comparisons == 2, "Duplicate pair must not be double-counted"
+
+        cached = engine.get_comparison("a", "b")
+        assert cached.winner == "a", "First recording of a pair wins"
+
+        print("\nEmpty batch is a no-op...")
+        assert engine.record_comparisons_bulk([]) == {}
+
+        engine.close()
+
+    print("✓ Bulk recording test passed\n")
+
+
 def test_edge_cases():
     print("\n" + "="*70)
     print("TEST 9: Edge Cases and Error Handling")
@@ -483,6 +517,7 @@ def run_all_tests():
         test_random_sampling,
         test_comparison_history,
         test_export_import,
+        test_bulk_recording,
         test_edge_cases,
         test_performance,
         test_mm_convergence,